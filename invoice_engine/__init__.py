@@ -0,0 +1,77 @@
+"""
+이카운트 → 홈택스 세금계산서 변환 엔진.
+"""
+from .bizno import BiznoIndex, normalize_bizno
+from .cache import ResultCache, content_key
+from .dates import normalize_dates
+from .disk_cache import DiskCache
+from .engine import (
+    ENGINE_VERSION,
+    KEY_COLUMNS,
+    MAX_SLOTS,
+    NUM_SLOTS,
+    PIVOT_VALUE_COLUMNS,
+    STRATEGIES,
+    VALUE_COLUMNS,
+    process_ecount_file,
+    vat_mismatches,
+)
+from .excel_io import iter_ecount_excel, read_ecount_excel
+from .hometax_writer import (
+    HOMETAX_MAX_ROWS,
+    split_for_upload,
+    to_hometax_excel,
+    to_hometax_zip,
+    write_hometax_chunks,
+    write_hometax_excel,
+)
+from .incremental import IncrementalResult, change_counts, convert_incremental, load_fingerprints, save_fingerprints
+from .jobs import CONVERSION_STAGES, Job, JobRunner, job_id_for
+from .metrics import StageTimer
+from .outofcore import convert_out_of_core
+from .profiling import ProfileRun
+from .rules import ItemRules, default_rules
+from .validation import ValidationError, has_errors, validate_ecount
+
+__all__ = [
+    'BiznoIndex',
+    'CONVERSION_STAGES',
+    'DiskCache',
+    'ENGINE_VERSION',
+    'HOMETAX_MAX_ROWS',
+    'IncrementalResult',
+    'ItemRules',
+    'Job',
+    'JobRunner',
+    'KEY_COLUMNS',
+    'MAX_SLOTS',
+    'NUM_SLOTS',
+    'PIVOT_VALUE_COLUMNS',
+    'ProfileRun',
+    'ResultCache',
+    'STRATEGIES',
+    'StageTimer',
+    'VALUE_COLUMNS',
+    'ValidationError',
+    'change_counts',
+    'content_key',
+    'convert_incremental',
+    'convert_out_of_core',
+    'default_rules',
+    'has_errors',
+    'iter_ecount_excel',
+    'job_id_for',
+    'load_fingerprints',
+    'normalize_bizno',
+    'normalize_dates',
+    'process_ecount_file',
+    'read_ecount_excel',
+    'save_fingerprints',
+    'split_for_upload',
+    'to_hometax_excel',
+    'to_hometax_zip',
+    'validate_ecount',
+    'vat_mismatches',
+    'write_hometax_chunks',
+    'write_hometax_excel',
+]
@@ -0,0 +1,327 @@
+"""
+여러 이카운트 엑셀 파일을 병렬로 홈택스 업로드 양식으로 변환하는 배치 실행기.
+
+사용 예:
+    python -m invoice_engine exports/ -o out/
+    python -m invoice_engine "exports/2025-07/*.xlsx" --strategy pivot -j 8
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, TextIO, Tuple
+
+from .engine import MAX_SLOTS, NUM_SLOTS, STRATEGIES, process_ecount_file
+from .excel_io import read_ecount_excel
+from .hometax_writer import HOMETAX_MAX_ROWS, write_hometax_chunks
+from .incremental import convert_incremental, load_fingerprints, save_fingerprints
+from .metrics import StageTimer
+from .outofcore import convert_out_of_core
+from .profiling import PROFILE_SUFFIX, ProfileRun
+from .rules import ItemRules, default_rules
+from .validation import ValidationError, has_errors, validate_ecount
+
+OUTPUT_SUFFIX = '_tax_upload'
+VALIDATION_SUFFIX = '_validation'
+DELTA_SUFFIX = '_delta'
+CHANGES_SUFFIX = '_changes'
+FINGERPRINT_SUFFIX = '_fingerprints'
+INPUT_PATTERNS = ('*.xlsx', '*.xls')
+
+
+def collect_input_files(inputs: List[str]) -> List[Path]:
+    """
+    디렉터리, glob 패턴, 파일 경로를 변환 대상 엑셀 파일 목록으로 펼칩니다.
+    """
+    files = []
+    for item in inputs:
+        path = Path(item)
+        if path.is_dir():
+            for pattern in INPUT_PATTERNS:
+                files.extend(path.glob(pattern))
+        elif path.is_file():
+            files.append(path)
+        else:
+            files.extend(Path(p) for p in glob.glob(item))
+
+    # 엑셀이 열려 있을 때 생기는 임시 파일(~$...)과 이전 변환 결과는 제외
+    seen = set()
+    result = []
+    for f in sorted(files):
+        if f.name.startswith('~$') or OUTPUT_SUFFIX in f.stem or f.resolve() in seen:
+            continue
+        seen.add(f.resolve())
+        result.append(f)
+    return result
+
+
+def output_dir_for(input_path: Path, output_dir: Optional[Path]) -> Path:
+    return output_dir if output_dir is not None else input_path.parent
+
+
+def output_stem_for(input_path: Path) -> str:
+    """입력 파일에 대응하는 출력 파일 이름 (예: 7월_부산.xlsx -> 7월_부산_tax_upload[_001].xlsx)."""
+    return f'{input_path.stem}{OUTPUT_SUFFIX}'
+
+
+def fingerprint_path_for(input_path: Path, incremental_dir: Path) -> Path:
+    """증분 변환에서 입력 파일의 지난 변환 지문을 저장하는 경로 (예: state/7월_부산_fingerprints.csv)."""
+    return incremental_dir / f'{input_path.stem}{FINGERPRINT_SUFFIX}.csv'
+
+
+def delta_stem_for(input_path: Path, output_dir: Path, when: Optional[datetime] = None) -> str:
+    """
+    증분 변환 업로드 파일 이름 (예: 7월_부산_tax_upload_delta_20250801_093000).
+
+    지문은 파일을 쓰자마자 갱신되므로, 지난 변경분을 업로드하기 전에 다시 실행해도 그 변경분이 사라지지 않도록
+    실행 시각을 붙여 지난 변경분 파일을 덮어쓰거나 지우지 않습니다. 같은 초에 다시 실행하면 번호를 더 붙입니다.
+    """
+    stem = f'{output_stem_for(input_path)}{DELTA_SUFFIX}_{(when or datetime.now()):%Y%m%d_%H%M%S}'
+    candidate, n = stem, 1
+    while any(output_dir.glob(f'{glob.escape(candidate)}*')):
+        n += 1
+        candidate = f'{stem}_{n}'
+    return candidate
+
+
+def convert_file(input_path: Path, output_dir: Path, chunk_size: int = HOMETAX_MAX_ROWS,
+                 validate: bool = True, profile_dir: Optional[Path] = None, incremental_dir: Optional[Path] = None,
+                 memory_budget_mb: Optional[float] = None, partition_workers: int = 1,
+                 write_workers: Optional[int] = 1, **options) -> Tuple[int, int, List[Path], List[Dict]]:
+    """
+    파일 하나를 읽고 변환해 업로드 파일(들)로 저장합니다. (작업 프로세스에서 실행)
+
+    Args:
+        validate (bool): 변환 전에 입력을 검증합니다. 오류가 있으면 검증 결과를
+            '<파일명>_validation.csv' 로 저장하고 변환하지 않습니다.
+        profile_dir (Path, optional): 지정하면 읽기부터 쓰기까지를 cProfile 로 기록해
+            '<파일명>_profile.prof' 와 상위 함수 표 '<파일명>_profile.txt' 로 저장합니다. (실패한 경우에도 저장)
+        incremental_dir (Path, optional): 지정하면 이 디렉터리에 저장된 지난 변환의 계산서 지문과 비교해
+            추가/변경된 계산서만 '<파일명>_tax_upload_delta_<실행 시각>' 으로 저장하고, 변경 요약을 같은 이름의
+            '_changes.csv' 로 남깁니다. 지난 변경분 파일은 지우지 않으므로 아직 올리지 않은 변경분을 모두 순서대로
+            업로드해야 합니다. 바뀐 계산서가 없으면 업로드 파일을 만들지 않습니다.
+        memory_budget_mb (float, optional): 지정하면 메모리보다 큰 파일용 대용량 변환(outofcore)으로,
+            원본을 조각씩 읽어 계산서 키로 나눈 임시 파일에 쌓은 뒤 파티션마다 이 예산 안에서 변환합니다.
+            증분 변환과 함께 쓸 수 없습니다.
+        partition_workers (int): 대용량 변환에서 파티션을 동시에 변환할 프로세스 수.
+        write_workers (int, optional): 나눈 업로드 파일을 동시에 쓸 프로세스 수. None 이면 CPU 코어 수.
+            (대용량 변환은 파티션 순서대로 쓰므로 쓰지 않음)
+        **options: process_ecount_file 에 그대로 넘길 변환 옵션 (strategy, num_slots, pack_slots, rules).
+
+    Returns:
+        Tuple[int, int, List[Path], List[Dict]]: (원본 행 수, 변환된 계산서 수, 저장된 파일 목록, 단계별 측정 기록)
+    """
+    if memory_budget_mb is not None:
+        if incremental_dir is not None:
+            raise ValueError('증분 변환과 대용량 변환(memory_budget_mb)은 함께 쓸 수 없습니다.')
+        convert = _convert_file_out_of_core
+        options.update(memory_budget_mb=memory_budget_mb, partition_workers=partition_workers)
+    else:
+        convert = _convert_file
+        options.update(incremental_dir=incremental_dir, write_workers=write_workers)
+
+    if profile_dir is None:
+        return convert(input_path, output_dir, chunk_size, validate, **options)
+
+    run = ProfileRun()
+    try:
+        with run.profile():
+            return convert(input_path, output_dir, chunk_size, validate, **options)
+    finally:
+        run.save(profile_dir, input_path.stem)
+
+
+def _convert_file_out_of_core(input_path: Path, output_dir: Path, chunk_size: int, validate: bool,
+                              memory_budget_mb: float, partition_workers: int,
+                              **options) -> Tuple[int, int, List[Path], List[Dict]]:
+    timer = StageTimer()
+    try:
+        rows_in, rows_out, paths = convert_out_of_core(
+            input_path, output_dir, output_stem_for(input_path), chunk_size, memory_budget_mb,
+            partition_workers, validate, timer=timer, **options)
+    except ValidationError as e:
+        _save_validation_report(e.report, input_path, output_dir)
+        raise
+    return rows_in, rows_out, paths, timer.records
+
+
+def _save_validation_report(report, input_path: Path, output_dir: Path) -> None:
+    output_dir.mkdir(parents=True, exist_ok=True)
+    report.to_csv(output_dir / f'{input_path.stem}{VALIDATION_SUFFIX}.csv', index=False, encoding='utf-8-sig')
+
+
+def _convert_file(input_path: Path, output_dir: Path, chunk_size: int, validate: bool,
+                  incremental_dir: Optional[Path], write_workers: Optional[int], **options) -> Tuple[int, int, List[Path], List[Dict]]:
+    timer = StageTimer()
+    with timer.stage('read') as record:
+        df = read_ecount_excel(input_path)
+        rows_in = record['rows_out'] = len(df)
+
+    if validate:
+        with timer.stage('validate', rows_in=rows_in) as record:
+            report = validate_ecount(df)
+            record['rows_out'] = len(report)
+        if has_errors(report):
+            _save_validation_report(report, input_path, output_dir)
+            raise ValidationError(report)
+
+    stem = output_stem_for(input_path)
+    if incremental_dir is None:
+        processed_df = process_ecount_file(df, timer=timer, **options)
+    else:
+        state_path = fingerprint_path_for(input_path, incremental_dir)
+        result = convert_incremental(df, load_fingerprints(state_path), timer=timer, **options)
+        processed_df = result.output
+        output_dir.mkdir(parents=True, exist_ok=True)
+        stem = delta_stem_for(input_path, output_dir)
+        if not result.summary.empty:
+            result.summary.to_csv(output_dir / f'{stem}{CHANGES_SUFFIX}.csv', index=False, encoding='utf-8-sig')
+
+    paths = []
+    with timer.stage('write', rows_in=len(processed_df)) as record:
+        if incremental_dir is None or not processed_df.empty:
+            paths = write_hometax_chunks(processed_df, output_dir, stem, chunk_size, max_workers=write_workers)
+        record['rows_out'] = len(processed_df)
+
+    if incremental_dir is not None:
+        # 업로드 파일을 다 쓴 뒤에 지문을 갱신해, 실패한 변환이 다음 비교 기준이 되지 않게 합니다.
+        save_fingerprints(result.fingerprints, state_path)
+    return rows_in, len(processed_df), paths, timer.records
+
+
+def run_batch(files: List[Path], output_dir: Optional[Path] = None, workers: Optional[int] = None,
+              chunk_size: int = HOMETAX_MAX_ROWS, log_json: Optional[TextIO] = None, **options) -> int:
+    """
+    파일 목록을 프로세스 풀에서 변환합니다.
+
+    파일이 여러 개면 파일 단위로 병렬 실행하므로 나눈 업로드 파일은 각 작업 프로세스에서 순서대로 쓰고,
+    파일이 하나면 그 파일의 업로드 파일들을 workers 개 프로세스로 나눠 씁니다.
+
+    Args:
+        log_json (TextIO, optional): 파일마다 결과와 단계별 측정 기록을 JSON 한 줄씩 남길 스트림.
+            표준 출력이면 JSON 만 읽을 수 있도록 진행 메시지는 표준 오류로 출력합니다.
+
+    Returns:
+        int: 실패한 파일 수.
+    """
+    if output_dir is not None:
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+    write_workers = workers if len(files) == 1 else 1
+    progress = sys.stderr if log_json is sys.stdout else sys.stdout
+    failures = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(convert_file, f, output_dir_for(f, output_dir), chunk_size,
+                        write_workers=write_workers, **options): f
+            for f in files
+        }
+        for future in as_completed(futures):
+            f = futures[future]
+            log = {'file': str(f), 'strategy': options.get('strategy', 'scatter')}
+            if options.get('profile_dir') is not None:
+                log['profile'] = str(options['profile_dir'] / f'{f.stem}{PROFILE_SUFFIX}.prof')
+            try:
+                rows_in, rows_out, paths, stages = future.result()
+            except ValidationError as e:
+                failures += 1
+                log.update(status='invalid', error=str(e))
+                print(f'[검증 실패] {f}: {e} ({f.stem}{VALIDATION_SUFFIX}.csv 참고)', file=sys.stderr)
+            except Exception as e:
+                failures += 1
+                log.update(status='failed', error=str(e))
+                print(f'[실패] {f}: {e}', file=sys.stderr)
+            else:
+                log.update(status='ok', rows_in=rows_in, rows_out=rows_out, outputs=[str(p) for p in paths],
+                           total_seconds=round(sum(s['seconds'] for s in stages), 4), stages=stages)
+                if not paths:
+                    print(f'[변경 없음] {f} ({rows_in}행, 지난 변환 이후 바뀐 계산서 없음)', file=progress)
+                else:
+                    names = paths[0].name if len(paths) == 1 else f'{paths[0].name} 외 {len(paths) - 1}개'
+                    print(f'[완료] {f} -> {paths[0].parent / names} ({rows_in}행 → {rows_out}건)', file=progress)
+            if log_json is not None:
+                log_json.write(json.dumps(log, ensure_ascii=False) + '\n')
+                log_json.flush()
+    return failures
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog='python -m invoice_engine',
+        description="이카운트 '판매현황(거래처품목별-TAX1양식)' 엑셀을 홈택스 대량 발행 양식으로 일괄 변환합니다.")
+    parser.add_argument('inputs', nargs='+', help='입력 파일, 디렉터리 또는 glob 패턴')
+    parser.add_argument('-o', '--output-dir', type=Path, default=None,
+                        help='결과 저장 디렉터리 (기본값: 입력 파일과 같은 위치)')
+    parser.add_argument('-s', '--strategy', choices=sorted(STRATEGIES), default='scatter',
+                        help='품목 펼치기 방식 (기본값: scatter)')
+    parser.add_argument('-j', '--workers', type=int, default=None,
+                        help=f'동시에 실행할 프로세스 수 (기본값: CPU 코어 수, 현재 {os.cpu_count()})')
+    parser.add_argument('-n', '--chunk-size', type=int, default=HOMETAX_MAX_ROWS,
+                        help=f'업로드 파일 1개당 계산서 건수, 0이면 나누지 않음 (기본값: {HOMETAX_MAX_ROWS})')
+    parser.add_argument('--slots', type=int, default=NUM_SLOTS,
+                        help=f'계산서 1장당 품목 칸 수, 최대 {MAX_SLOTS} (기본값: {NUM_SLOTS})')
+    parser.add_argument('--pack', action='store_true',
+                        help='품목을 1번 칸부터 빈 칸 없이 채우고, 넘치는 품목은 계산서를 추가해 발행')
+    parser.add_argument('--rules', type=Path, default=None,
+                        help='품목 칸 배정 규칙 CSV (기본값: invoice_engine/item_rules.csv)')
+    parser.add_argument('--no-validate', dest='validate', action='store_false',
+                        help='변환 전 입력 검증(공급가액, 사업자등록번호, 작성일자, 세액)을 건너뜀')
+    parser.add_argument('--log-json', default=None, metavar='FILE',
+                        help="파일별 결과와 단계별 시간/메모리를 JSON Lines 로 저장 ('-' 이면 표준 출력)")
+    parser.add_argument('--incremental', type=Path, default=None, metavar='DIR',
+                        help='DIR 에 저장된 지난 변환의 계산서 지문과 비교해 추가/변경된 계산서만 '
+                             '<파일명>_tax_upload_delta_<실행 시각> 으로 저장하고 지문을 갱신 '
+                             '(지난 변경분 파일은 남겨 두므로 올리지 않은 변경분을 모두 순서대로 업로드)')
+    parser.add_argument('--memory-budget', type=float, default=None, metavar='MB',
+                        help='메모리보다 큰 파일용: 원본을 조각씩 읽어 계산서 키로 나눈 임시 파일(TMPDIR)에 쌓고 '
+                             '파티션마다 파일당 MB 안에서 변환')
+    parser.add_argument('--partition-workers', type=int, default=1, metavar='N',
+                        help='--memory-budget 에서 파티션을 동시에 변환할 프로세스 수 (기본값: 1, 예산을 나눠 씀)')
+    parser.add_argument('--profile', type=Path, default=None, metavar='DIR',
+                        help='파일마다 cProfile 결과(<파일명>_profile.prof, 상위 함수 표 .txt)를 DIR 에 저장')
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.memory_budget is not None and args.incremental is not None:
+        parser.error('--memory-budget 과 --incremental 은 함께 쓸 수 없습니다.')
+    if not 1 <= args.slots <= MAX_SLOTS:
+        parser.error(f'--slots 는 1~{MAX_SLOTS} 사이여야 합니다: {args.slots}')
+
+    rules = ItemRules.from_csv(args.rules) if args.rules is not None else None
+    # 고정 칸 방식은 규칙표의 칸 번호를 그대로 쓰므로, 변환을 시작하기 전에 칸 수가 모자라는지 확인합니다.
+    needed = (rules or default_rules()).max_slot
+    if not args.pack and args.slots < needed:
+        parser.error(f'규칙표에 {needed}번 품목 칸이 있어 --slots {args.slots} 로는 변환할 수 없습니다. '
+                     f'--slots {needed} 이상으로 하거나 --pack 을 함께 쓰세요.')
+
+    files = collect_input_files(args.inputs)
+    if not files:
+        print('변환할 엑셀 파일을 찾지 못했습니다.', file=sys.stderr)
+        return 1
+
+    if args.log_json is None:
+        log_json = None
+    elif args.log_json == '-':
+        log_json = sys.stdout
+    else:
+        log_json = open(args.log_json, 'a', encoding='utf-8')
+    progress = sys.stderr if log_json is sys.stdout else sys.stdout
+    print(f'{len(files)}개 파일 변환을 시작합니다.', file=progress)
+    try:
+        failures = run_batch(files, args.output_dir, args.workers, args.chunk_size, log_json=log_json,
+                             validate=args.validate, profile_dir=args.profile,
+                             incremental_dir=args.incremental, memory_budget_mb=args.memory_budget,
+                             partition_workers=args.partition_workers, strategy=args.strategy, num_slots=args.slots,
+                             pack_slots=args.pack, rules=rules)
+    finally:
+        if log_json is not None and log_json is not sys.stdout:
+            log_json.close()
+    print(f'완료: {len(files) - failures}개 성공, {failures}개 실패', file=progress)
+    return 1 if failures else 0
@@ -0,0 +1,155 @@
+"""
+가상 이카운트 데이터로 읽기 / 변환 전략별 / 쓰기 단계를 측정하는 벤치마크.
+
+단계마다 새 프로세스에서 실행해 최대 메모리(peak RSS)가 다른 단계의 영향을 받지 않게 합니다.
+
+사용 예:
+    python -m invoice_engine.benchmark
+    python -m invoice_engine.benchmark --sizes 10k,100k --stages scatter,pivot --repeat 3 --json bench.json
+"""
+import argparse
+import json
+import multiprocessing
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .engine import STRATEGIES, process_ecount_file
+from .excel_io import read_ecount_excel
+from .hometax_writer import write_hometax_excel
+from .metrics import reset_peak_rss, rss_mb
+from .synthetic import synthetic_ecount, write_ecount_excel
+
+DEFAULT_SIZES = '1k,10k,100k,1m'
+READ_STAGE = 'read'
+WRITE_STAGE = 'write'
+STAGES = [READ_STAGE] + sorted(STRATEGIES) + [WRITE_STAGE]
+
+
+def parse_size(text: str) -> int:
+    """'10k', '1m', '2500' 같은 행 수 표기를 정수로 바꿉니다."""
+    text = text.strip().lower()
+    scale = {'k': 1_000, 'm': 1_000_000}.get(text[-1:], 1)
+    return int(float(text.rstrip('km')) * scale)
+
+
+def run_stage(stage: str, n_rows: int, seed: int, repeat: int, input_path: Optional[str] = None) -> Dict:
+    """
+    단계 하나를 repeat 번 실행해 가장 빠른 시간과 메모리를 잽니다. (측정용 새 프로세스에서 실행)
+
+    Returns:
+        Dict: rows, stage, out_rows, seconds, rows_per_sec (입력 행 기준),
+            base_rss_mb (측정 직전 메모리), peak_rss_mb (측정 중 최대 메모리, 잴 수 없는 OS 에서는 None)
+    """
+    # 1. 측정 대상이 아닌 준비 작업
+    tmp_dir = None
+    if stage == READ_STAGE:
+        def work():
+            return read_ecount_excel(input_path)
+    else:
+        df = synthetic_ecount(n_rows, seed)
+        if stage == WRITE_STAGE:
+            converted = process_ecount_file(df)
+            out_rows = len(converted)
+            tmp_dir = tempfile.TemporaryDirectory()
+            target = Path(tmp_dir.name) / 'bench_tax_upload.xlsx'
+
+            def work():
+                write_hometax_excel(converted, target)
+        else:
+            def work():
+                return process_ecount_file(df, strategy=stage)
+
+    # 2. 측정
+    base_rss = rss_mb('VmRSS')
+    reset_peak_rss()
+    seconds = float('inf')
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = work()
+            seconds = min(seconds, time.perf_counter() - start)
+            if stage != WRITE_STAGE:
+                out_rows = len(result)
+            del result
+    finally:
+        if tmp_dir is not None:
+            tmp_dir.cleanup()
+
+    return {
+        'rows': n_rows,
+        'stage': stage,
+        'out_rows': out_rows,
+        'seconds': round(seconds, 4),
+        'rows_per_sec': round(n_rows / seconds) if seconds > 0 else None,
+        'base_rss_mb': _round_mb(base_rss),
+        'peak_rss_mb': _round_mb(rss_mb()),
+    }
+
+
+def _round_mb(value: Optional[float]) -> Optional[float]:
+    return None if value is None else round(value, 1)
+
+
+def run_benchmark(sizes: List[int], stages: List[str], seed: int = 0, repeat: int = 1) -> List[Dict]:
+    """
+    크기 × 단계마다 새 프로세스에서 run_stage 를 실행하고 결과를 출력합니다.
+
+    Returns:
+        List[Dict]: 측정 결과 목록 (run_stage 참고).
+    """
+    # fork 한 프로세스는 부모의 메모리를 물려받으므로 spawn 으로 깨끗한 프로세스에서 잽니다.
+    context = multiprocessing.get_context('spawn')
+    results = []
+    print(f"{'rows':>9} {'stage':<8} {'out':>8} {'seconds':>9} {'rows/s':>10} {'base MB':>9} {'peak MB':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_rows in sizes:
+            input_path = None
+            if READ_STAGE in stages:
+                input_path = str(Path(tmp) / f'ecount_{n_rows}.xlsx')
+                write_ecount_excel(synthetic_ecount(n_rows, seed), input_path)
+
+            for stage in stages:
+                with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                    r = pool.submit(run_stage, stage, n_rows, seed, repeat, input_path).result()
+                results.append(r)
+                print(f"{r['rows']:>9} {r['stage']:<8} {r['out_rows']:>8} {r['seconds']:>9.3f} "
+                      f"{r['rows_per_sec'] or 0:>10,} {r['base_rss_mb'] or 0:>9.1f} {r['peak_rss_mb'] or 0:>9.1f}",
+                      flush=True)
+    return results
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog='python -m invoice_engine.benchmark',
+        description='가상 이카운트 데이터로 읽기, 변환 전략별, 홈택스 엑셀 쓰기 시간과 메모리를 측정합니다.')
+    parser.add_argument('--sizes', default=DEFAULT_SIZES,
+                        help=f'측정할 품목 행 수, 쉼표로 구분 (기본값: {DEFAULT_SIZES})')
+    parser.add_argument('--stages', default=','.join(STAGES),
+                        help=f"측정할 단계, 쉼표로 구분 (기본값: {','.join(STAGES)})")
+    parser.add_argument('--repeat', type=int, default=1, help='단계마다 반복 횟수, 가장 빠른 시간을 기록 (기본값: 1)')
+    parser.add_argument('--seed', type=int, default=0, help='가상 데이터 난수 시드 (기본값: 0)')
+    parser.add_argument('--json', type=Path, default=None, help='측정 결과를 저장할 JSON 파일 (회귀 비교용)')
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    sizes = [parse_size(s) for s in args.sizes.split(',') if s.strip()]
+    stages = [s.strip() for s in args.stages.split(',') if s.strip()]
+    unknown = [s for s in stages if s not in STAGES]
+    if unknown:
+        print(f"알 수 없는 단계: {', '.join(unknown)} (가능한 값: {', '.join(STAGES)})", file=sys.stderr)
+        return 2
+
+    results = run_benchmark(sizes, stages, args.seed, args.repeat)
+    if args.json is not None:
+        args.json.write_text(json.dumps(results, ensure_ascii=False, indent=2), encoding='utf-8')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,150 @@
+"""
+사업자등록번호 정규화와 검증.
+
+이카운트 엑셀의 등록번호는 숫자(2298500670), 실수(2298500670.0), 하이픈이 들어간 문자열(229-85-00670) 등
+여러 형태로 들어옵니다. 계산서 키가 같은 거래처를 둘로 나누지 않도록 변환 전에 숫자만 남긴 문자열로 통일합니다.
+종사업장 표시('_B')는 별도 계산서를 구분하는 값이므로 유지하고, 최종 출력에서만 제거합니다.
+
+사업자등록번호 10자리 중 마지막 자리는 검증번호입니다.
+앞 9자리에 가중치 (1, 3, 7, 1, 3, 7, 1, 3, 5)를 곱해 더하고, 9번째 자리 × 5 의 십의 자리를 더한 합을
+10 으로 나눈 나머지를 10 에서 뺀 값(의 일의 자리)이 검증번호와 같아야 합니다.
+"""
+import threading
+from typing import Dict, Hashable, Optional
+
+import numpy as np
+import pandas as pd
+
+BIZNO_LENGTH = 10
+BIZNO_WEIGHTS = np.array([1, 3, 7, 1, 3, 7, 1, 3, 5], dtype=np.int64)
+BRANCH_SUFFIX = '_B'
+
+# 한 서버 프로세스에서 기억할 거래처 등록번호 수 (넘으면 비우고 다시 채움)
+DEFAULT_MAX_ENTRIES = 200_000
+
+
+class BiznoIndex:
+    """
+    원본 등록번호 값 → 정규화한 번호, 정규화한 번호 → 검증번호 일치 여부를 기억하는 조회표.
+
+    같은 거래처가 파일마다, 행마다 반복되므로 처음 보는 값만 계산하고
+    이후에는 고유값 단위로 조회표에서 꺼내 정수 코드로 행 전체에 펼칩니다.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._canonical: Dict[Hashable, str] = {}
+        self._valid: Dict[str, bool] = {}
+        self._lock = threading.Lock()
+
+    def normalize(self, values: pd.Series) -> pd.Series:
+        """
+        등록번호 컬럼을 정규화한 문자열 컬럼으로 바꿉니다. (빈 값은 '')
+
+        Args:
+            values (pd.Series): 원본 등록번호 컬럼 (숫자, 실수, 문자열, 범주형 모두 가능).
+
+        Returns:
+            pd.Series: 숫자만 남긴 등록번호 (종사업장 표시 '_B' 는 유지).
+        """
+        codes, uniques = pd.factorize(values, use_na_sentinel=True)
+        uniques = pd.Series(uniques, dtype=values.dtype if _is_numeric(values) else object)
+
+        found = [self._canonical.get(u) for u in uniques]
+        missing = [i for i, c in enumerate(found) if c is None]
+        if missing:
+            computed = canonicalize_bizno(uniques.iloc[missing]).tolist()
+            with self._lock:
+                if len(self._canonical) + len(missing) > self.max_entries:
+                    self._canonical.clear()
+                self._canonical.update(zip(uniques.iloc[missing], computed))
+            for i, c in zip(missing, computed):
+                found[i] = c
+
+        # 빈 값(코드 -1)은 마지막에 덧붙인 '' 를 가리킵니다.
+        table = pd.array(found + [''], dtype='str')
+        return pd.Series(table.take(np.where(codes >= 0, codes, len(found))), index=values.index, name=values.name)
+
+    def is_valid(self, normalized: pd.Series) -> np.ndarray:
+        """정규화한 등록번호마다 10자리이고 검증번호가 맞는지 확인합니다. ('_B' 는 제외하고 검사)"""
+        codes, uniques = pd.factorize(normalized, use_na_sentinel=True)
+        found = [self._valid.get(u) for u in uniques]
+        missing = [i for i, v in enumerate(found) if v is None]
+        if missing:
+            keys = [uniques[i] for i in missing]
+            computed = checksum_ok(pd.Series(keys, dtype=object).str.replace(BRANCH_SUFFIX, '', regex=False)).tolist()
+            with self._lock:
+                if len(self._valid) + len(missing) > self.max_entries:
+                    self._valid.clear()
+                self._valid.update(zip(keys, computed))
+            for i, v in zip(missing, computed):
+                found[i] = v
+
+        valid = np.array(found + [False], dtype=bool)
+        return valid[np.where(codes >= 0, codes, len(found))]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._canonical.clear()
+            self._valid.clear()
+
+    def __len__(self) -> int:
+        return len(self._canonical)
+
+
+_default_index = BiznoIndex()
+
+
+def default_bizno_index() -> BiznoIndex:
+    """프로세스 전체에서 함께 쓰는 등록번호 조회표."""
+    return _default_index
+
+
+def normalize_bizno(values: pd.Series, index: Optional[BiznoIndex] = None) -> pd.Series:
+    """등록번호 컬럼을 정규화합니다. (BiznoIndex.normalize 참고)"""
+    return (index or _default_index).normalize(values)
+
+
+def bizno_is_valid(normalized: pd.Series, index: Optional[BiznoIndex] = None) -> np.ndarray:
+    """정규화한 등록번호 컬럼의 검증번호를 확인합니다. (BiznoIndex.is_valid 참고)"""
+    return (index or _default_index).is_valid(normalized)
+
+
+def canonicalize_bizno(values: pd.Series) -> pd.Series:
+    """
+    등록번호 값들을 배열 연산으로 정규화합니다. (조회표 없이 값마다 계산)
+
+    - 숫자형 컬럼: 정수로 바꿔 문자열로 (2298500670.0 -> '2298500670')
+    - 문자열: 공백/하이픈 제거, 실수를 문자열로 바꾼 꼬리 '.0' 제거 ('229-85-00670' -> '2298500670')
+    - 빈 값: ''
+    """
+    if _is_numeric(values):
+        numbers = values.to_numpy(dtype=float, na_value=np.nan)
+        present = np.isfinite(numbers)
+        result = np.full(len(numbers), '', dtype=object)
+        result[present] = np.rint(numbers[present]).astype(np.int64).astype(str)
+        return pd.Series(result, index=values.index, dtype='str')
+
+    text = values.astype(object).where(values.notna(), '').astype(str)
+    return (text.str.replace(r'[\s\-]', '', regex=True)
+            .str.replace(r'\.0+(?=(?:_B)?$)', '', regex=True))
+
+
+def checksum_ok(numbers: pd.Series) -> np.ndarray:
+    """
+    숫자 문자열마다 10자리이고 검증번호가 맞는지 배열 연산으로 확인합니다.
+    """
+    numbers = numbers.astype(str)
+    valid = np.zeros(len(numbers), dtype=bool)
+    shaped = numbers.str.fullmatch(r'\d{10}').to_numpy(dtype=bool, na_value=False)
+    if shaped.any():
+        # 10자리 숫자 문자열을 한 번에 (n, 10) 숫자 배열로 변환
+        digits = (np.frombuffer(''.join(numbers[shaped]).encode('ascii'), dtype=np.uint8)
+                  .reshape(-1, BIZNO_LENGTH).astype(np.int64) - ord('0'))
+        total = digits[:, :9] @ BIZNO_WEIGHTS + (digits[:, 8] * 5) // 10
+        valid[shaped] = (10 - total % 10) % 10 == digits[:, 9]
+    return valid
+
+
+def _is_numeric(values: pd.Series) -> bool:
+    return pd.api.types.is_numeric_dtype(values.dtype) and not pd.api.types.is_bool_dtype(values.dtype)
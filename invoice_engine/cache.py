@@ -0,0 +1,126 @@
+"""
+변환 결과 메모리 캐시.
+
+업로드한 파일 내용의 SHA-256 과 엔진 버전, 변환 옵션을 키로 원본 데이터프레임,
+변환 결과, 다운로드용 엑셀 바이트를 저장합니다. Streamlit 은 위젯을 누를 때마다 스크립트를
+처음부터 다시 실행하므로, 같은 파일이면 다시 읽거나 변환하지 않고 캐시된 값을 돌려줍니다.
+
+DiskCache 를 연결하면 메모리에 없는 값은 디스크에서 찾고, 새로 계산한 값은 디스크에도 저장해
+다른 서버 프로세스와 공유합니다.
+"""
+import hashlib
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional, Tuple
+
+import pandas as pd
+
+from .disk_cache import DiskCache
+from .engine import ENGINE_VERSION
+
+# 기본 캐시 한도
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+DEFAULT_MAX_ENTRIES = 64
+
+
+def content_key(data: bytes) -> str:
+    """파일 내용 + 엔진 버전의 SHA-256. (엔진이 바뀌면 이전 결과는 자동으로 무효)"""
+    digest = hashlib.sha256(data)
+    digest.update(ENGINE_VERSION.encode())
+    return digest.hexdigest()
+
+
+def estimate_size(value: Any) -> int:
+    """캐시 값이 차지하는 대략적인 메모리 크기 (바이트)."""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, tuple):
+        return sum(estimate_size(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class ResultCache:
+    """
+    크기 제한이 있는 LRU 캐시. 여러 Streamlit 세션(스레드)에서 동시에 사용할 수 있습니다.
+
+    저장된 데이터프레임은 여러 곳에서 함께 쓰므로, 꺼낸 값을 수정하려면 복사본을 사용해야 합니다.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 disk: Optional[DiskCache] = None):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.disk = disk
+        self._entries: 'OrderedDict[Hashable, Tuple[Any, int]]' = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+
+        if self.disk is not None:
+            value = self.disk.get(key)
+            if value is not None:
+                self._put_memory(key, value)
+                with self._lock:
+                    self.hits += 1
+                return value
+
+        with self._lock:
+            self.misses += 1
+        return default
+
+    def can_hold(self, value: Any) -> bool:
+        """value 를 메모리에 보관할 수 있는지. (max_bytes 보다 큰 값은 저장하지 않음)"""
+        return estimate_size(value) <= self.max_bytes
+
+    def put(self, key: Hashable, value: Any) -> None:
+        self._put_memory(key, value)
+        if self.disk is not None:
+            self.disk.put(key, value)
+
+    def _put_memory(self, key: Hashable, value: Any) -> None:
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            return  # 한도보다 큰 값은 저장하지 않습니다.
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._total_bytes -= old[1]
+            self._entries[key] = (value, size)
+            self._total_bytes += size
+            while self._entries and (self._total_bytes > self.max_bytes or len(self._entries) > self.max_entries):
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._total_bytes -= evicted_size
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """캐시에 있으면 꺼내고, 없으면 compute() 결과를 저장한 뒤 돌려줍니다."""
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            # 오래 걸리는 계산 중에도 다른 세션이 캐시를 쓸 수 있도록 잠금 밖에서 계산합니다.
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
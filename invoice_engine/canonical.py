@@ -0,0 +1,30 @@
+"""
+값을 비교/해시용 표준 문자열로 바꾸는 도구.
+
+같은 값이 정수/실수, 범주형/문자열처럼 다른 dtype 으로 읽혀도 같은 문자열이 되므로,
+증분 변환의 계산서 지문과 변환 전략 비교(equivalence)에서 함께 씁니다.
+"""
+import numpy as np
+import pandas as pd
+
+
+def canonical_values(df: pd.DataFrame) -> pd.DataFrame:
+    """값만 표준 문자열로 바꾼 데이터프레임. (행 순서와 인덱스는 그대로)"""
+    return pd.DataFrame({col: _canonical_column(df[col]) for col in df.columns}, index=df.index)
+
+
+def _canonical_column(values: pd.Series) -> np.ndarray:
+    # 고유값마다 한 번만 변환해 정수 코드로 펼칩니다. (빈 값 코드 -1 은 마지막의 '')
+    codes, uniques = pd.factorize(values, use_na_sentinel=True)
+    table = np.array([_canonical_value(v) for v in uniques] + [''], dtype=object)
+    return table[codes]
+
+
+def _canonical_value(value) -> str:
+    if value is None or (isinstance(value, float) and value != value):
+        return ''
+    if isinstance(value, (float, np.floating)) and float(value).is_integer():
+        return str(int(value))
+    if isinstance(value, (int, np.integer)) and not isinstance(value, bool):
+        return str(int(value))
+    return str(value)
@@ -0,0 +1,123 @@
+"""
+작성일자 정규화.
+
+이카운트 '판매현황' 의 일자는 보통 '20250725-1'(일자-전표번호) 문자열이지만, 파일을 다시 저장하거나
+다른 경로로 내보내면 정수(20250725), 엑셀 날짜(셀 서식이 날짜라 datetime 으로 읽힘),
+엑셀 날짜 일련번호(45863), 구분자가 있는 문자열('2025-07-25', '2025.7.25') 등으로 들어옵니다.
+문자열 앞 8자를 자르는 방식은 날짜로 읽힌 값에서 '2025-07-' 같은 키를 만들어 계산서를 잘못 묶으므로,
+표현 방식을 가려 모두 'yyyymmdd' 로 통일합니다.
+
+같은 날짜가 수많은 행에 반복되므로 고유값만 배열 연산으로 변환한 뒤 정수 코드로 행 전체에 펼칩니다.
+"""
+from datetime import date
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+# 엑셀 날짜 일련번호의 기준일 (1900 윤년 버그를 반영해 1899-12-31 이 아닌 12-30) 과 최대값(9999-12-31 다음 날)
+EXCEL_EPOCH = np.datetime64('1899-12-30', 'D')
+EXCEL_SERIAL_MAX = 2958466
+
+# yyyymmdd 정수로 볼 범위
+YMD_MIN = 10000101
+YMD_MAX = 99991231
+
+# 구분자가 있거나 뒤에 전표번호 등이 붙은 문자열에서 연, 월, 일을 찾는 패턴
+# (예: '20250725-1', '2025-07-25 00:00:00', '2025/7/5', '2025. 7. 25.', '2025년 7월 25일')
+DATE_PATTERN = r'^\s*(\d{4})\s*[-./년]?\s*(\d{1,2})\s*[-./월]?\s*(\d{1,2})'
+
+# 일(0~99) → 'dd' 문자열 조회표
+_DAY_TEXT = np.array([f'{day:02d}' for day in range(100)])
+
+
+def normalize_dates(values: pd.Series) -> Tuple[pd.Series, pd.Series]:
+    """
+    작성일자 컬럼을 'yyyymmdd' 와 일자 'dd' 문자열 컬럼으로 바꿉니다.
+
+    Args:
+        values (pd.Series): 작성일자 원본 컬럼 (문자열, 범주형, 정수, 실수, datetime 중 어느 것이든).
+
+    Returns:
+        Tuple[pd.Series, pd.Series]: (작성일자, 일자). 빈 값이나 실제 날짜로 읽을 수 없는 값은 ''.
+            인덱스는 원본과 같습니다.
+    """
+    codes, uniques = pd.factorize(values)
+    ymd = unique_ymd(uniques)
+    ok = is_calendar_date(ymd)
+    dates = np.where(ok, ymd.astype(str), '')
+    days = np.where(ok, _DAY_TEXT[ymd % 100], '')
+
+    # 빈 값(코드 -1)은 끝에 덧붙인 '' 를 가리키게 합니다.
+    codes = np.where(codes < 0, len(ymd), codes)
+    return _spread(dates, codes, values.index), _spread(days, codes, values.index)
+
+
+def unique_ymd(uniques) -> np.ndarray:
+    """
+    고유값 배열을 yyyymmdd 정수 배열로 바꿉니다. (읽을 수 없으면 0, 달력에 없는 날짜인지는 검사하지 않음)
+    """
+    if isinstance(uniques, pd.Categorical):
+        uniques = np.asarray(uniques)
+    if isinstance(uniques, pd.DatetimeIndex) or pd.api.types.is_datetime64_any_dtype(uniques):
+        return _datetime_ymd(pd.DatetimeIndex(uniques))
+    if pd.api.types.is_numeric_dtype(uniques) and not pd.api.types.is_bool_dtype(uniques):
+        return _number_ymd(np.asarray(uniques, dtype=float))
+
+    values = pd.Series(np.asarray(uniques, dtype=object), dtype=object)
+    ymd = np.zeros(len(values), dtype=np.int64)
+
+    # 1. 날짜 객체 (엑셀 날짜 셀이 문자열과 섞여 있는 컬럼)
+    is_time = np.array([isinstance(v, (date, np.datetime64)) for v in values], dtype=bool)
+    if is_time.any():
+        ymd[is_time] = _datetime_ymd(pd.DatetimeIndex(pd.to_datetime(values[is_time])))
+
+    # 2. 숫자로만 된 값 (정수/실수 yyyymmdd, 일련번호)
+    text = values[~is_time].astype(str)
+    numbers = pd.to_numeric(text, errors='coerce').to_numpy(dtype=float)
+    is_number = ~np.isnan(numbers)
+    rest = np.flatnonzero(~is_time)
+    ymd[rest[is_number]] = _number_ymd(numbers[is_number])
+
+    # 3. 구분자가 있거나 뒤에 다른 값이 붙은 문자열
+    if (~is_number).any():
+        parts = text[~is_number].str.extract(DATE_PATTERN).apply(pd.to_numeric).to_numpy(dtype=float)
+        found = ~np.isnan(parts).any(axis=1)
+        parsed = np.zeros(len(parts), dtype=np.int64)
+        parsed[found] = (parts[found] @ np.array([10000, 100, 1])).astype(np.int64)
+        ymd[rest[~is_number]] = parsed
+    return ymd
+
+
+def is_calendar_date(ymd: np.ndarray) -> np.ndarray:
+    """yyyymmdd 정수가 달력에 있는 날짜인지 (월 1~12, 일 1~그 달의 마지막 날) 배열로 검사합니다."""
+    year, month, day = ymd // 10000, ymd // 100 % 100, ymd % 100
+    ok = (ymd >= YMD_MIN) & (ymd <= YMD_MAX) & (month >= 1) & (month <= 12) & (day >= 1)
+    months = ((year - 1970) * 12 + np.clip(month, 1, 12) - 1).astype('datetime64[M]')
+    month_days = ((months + 1).astype('datetime64[D]') - months.astype('datetime64[D]')).astype(np.int64)
+    return ok & (day <= month_days)
+
+
+def _number_ymd(numbers: np.ndarray) -> np.ndarray:
+    """숫자 배열: 8자리 정수는 yyyymmdd, 그보다 작은 양수는 엑셀 날짜 일련번호(소수점 아래는 시각)로 봅니다."""
+    ymd = np.zeros(len(numbers), dtype=np.int64)
+    finite = np.isfinite(numbers)
+    is_ymd = finite & (numbers >= YMD_MIN) & (numbers <= YMD_MAX) & (np.floor(numbers) == numbers)
+    ymd[is_ymd] = numbers[is_ymd].astype(np.int64)
+
+    is_serial = finite & (numbers >= 1) & (numbers < EXCEL_SERIAL_MAX)
+    if is_serial.any():
+        days = EXCEL_EPOCH + np.floor(numbers[is_serial]).astype(np.int64).astype('timedelta64[D]')
+        ymd[is_serial] = _datetime_ymd(pd.DatetimeIndex(days))
+    return ymd
+
+
+def _datetime_ymd(index: pd.DatetimeIndex) -> np.ndarray:
+    """날짜 배열 → yyyymmdd 정수 (NaT 는 0)."""
+    ymd = (index.year * 10000 + index.month * 100 + index.day).to_numpy(dtype=float)
+    return np.nan_to_num(ymd, nan=0).astype(np.int64)
+
+
+def _spread(unique_values: np.ndarray, codes: np.ndarray, index: pd.Index) -> pd.Series:
+    array = pd.array(np.append(unique_values, ''), dtype=str)
+    return pd.Series(array.take(codes), index=index)
@@ -0,0 +1,216 @@
+"""
+여러 서버 프로세스가 함께 쓰는 디스크 캐시.
+
+파일 내용 해시로 이름을 정하는(content-addressed) 저장소입니다. 같은 디렉터리를 바라보는
+Streamlit 복제 서버들은 다른 서버가 이미 읽거나 변환한 결과를 그대로 가져다 씁니다.
+외부 서비스 없이 로컬(또는 공유) 파일 시스템만 사용합니다.
+
+- 데이터프레임은 parquet 로, 엑셀/zip 결과는 바이트 그대로 저장합니다. 공유 디렉터리에 쓸 수 있는 누구나
+  파일을 바꿔 놓을 수 있으므로, 읽을 때 코드가 실행될 수 있는 pickle 은 쓰지도 읽지도 않습니다.
+  (parquet 로 저장할 수 없는 값은 디스크에 저장하지 않음)
+- 마지막으로 사용한 뒤 ttl 이 지난 항목과, 전체 크기가 max_bytes 를 넘을 때 오래 쓰지 않은 항목을 지웁니다.
+  쓰는 도중 프로세스가 종료되어 남은 임시 파일은 TMP_MAX_AGE_SECONDS 가 지나면 지웁니다.
+  디렉터리 전체 확인은 저장한 크기의 누계가 max_bytes 를 넘었을 때와 EVICT_EVERY_PUTS 번 저장할 때마다만 합니다.
+
+환경 변수:
+    INVOICE_CACHE_DIR: 저장 위치 (기본값: ~/.cache/invoice_engine). 'off' 이면 사용하지 않음.
+    INVOICE_CACHE_MAX_MB: 최대 크기 (기본값: 2048)
+    INVOICE_CACHE_TTL_HOURS: 보관 시간 (기본값: 168 = 7일)
+"""
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Hashable, Optional, Union
+
+import pandas as pd
+
+DEFAULT_DIR = Path.home() / '.cache' / 'invoice_engine'
+DEFAULT_MAX_BYTES = 2048 * 1024 * 1024
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+
+# 다른 프로세스가 쓴 파일과 만료된 항목을 반영하려고 디렉터리 전체를 다시 확인하는 저장 횟수
+EVICT_EVERY_PUTS = 64
+# 한도를 넘으면 이 비율까지 지워, 꽉 찬 캐시에서 저장할 때마다 전체를 확인하지 않게 합니다.
+EVICT_TARGET_RATIO = 0.9
+
+# 쓰는 중인 임시 파일로 보고 남겨 두는 시간 (이보다 오래된 임시 파일은 중단된 쓰기로 보고 지움)
+TMP_MAX_AGE_SECONDS = 3600
+
+_SUFFIXES = ('.parquet', '.bin')
+_TMP_PREFIX = '.tmp-'
+# 예전 버전이 저장한 pickle 파일 (읽지 않고 정리할 때 지움)
+_LEGACY_SUFFIXES = ('.pkl',)
+
+
+def disk_key(key: Hashable) -> str:
+    """캐시 키(튜플 등)를 파일 이름으로 쓸 수 있는 해시 문자열로 바꿉니다."""
+    return hashlib.sha256(repr(key).encode()).hexdigest()
+
+
+class DiskCache:
+    """
+    크기/보관 시간 제한이 있는 디스크 캐시. 쓰기는 임시 파일에 쓴 뒤 이름을 바꿔
+    여러 프로세스가 동시에 읽고 써도 반쯤 쓰인 파일을 읽지 않습니다.
+    """
+
+    def __init__(self, root: Union[str, Path] = DEFAULT_DIR, max_bytes: int = DEFAULT_MAX_BYTES,
+                 ttl_seconds: float = DEFAULT_TTL_SECONDS):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.root.mkdir(parents=True, exist_ok=True)
+        # 이 프로세스가 아는 전체 크기 (마지막 확인 값 + 그 뒤에 저장한 크기, 확인 전에는 None)
+        self._approx_bytes: Optional[int] = None
+        self._puts = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> Optional['DiskCache']:
+        """환경 변수 설정으로 캐시를 만듭니다. 사용하지 않도록 설정했거나 만들 수 없으면 None."""
+        root = os.environ.get('INVOICE_CACHE_DIR', str(DEFAULT_DIR))
+        if root.lower() in ('', 'off', 'none', '0'):
+            return None
+        max_mb = float(os.environ.get('INVOICE_CACHE_MAX_MB', DEFAULT_MAX_BYTES / 1024 / 1024))
+        ttl_hours = float(os.environ.get('INVOICE_CACHE_TTL_HOURS', DEFAULT_TTL_SECONDS / 3600))
+        try:
+            return cls(root, int(max_mb * 1024 * 1024), ttl_hours * 3600)
+        except OSError:
+            return None
+
+    def _base(self, key: Hashable) -> Path:
+        name = disk_key(key)
+        return self.root / name[:2] / name
+
+    def get(self, key: Hashable) -> Any:
+        """저장된 값을 읽습니다. 없거나 만료됐으면 None."""
+        base = self._base(key)
+        for suffix in _SUFFIXES:
+            path = base.with_suffix(suffix)
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            if time.time() - stat.st_mtime > self.ttl_seconds:
+                _unlink(path)
+                return None
+            try:
+                value = _read(path)
+            except Exception:
+                # 다른 프로세스가 지웠거나 손상된 파일은 없는 것으로 취급
+                _unlink(path)
+                return None
+            # 마지막 사용 시각을 갱신해 오래 쓰지 않은 항목부터 지우도록 합니다.
+            _touch(path)
+            return value
+        return None
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """값을 저장합니다. 데이터프레임과 bytes 만 저장하고 나머지는 무시합니다."""
+        if not isinstance(value, (pd.DataFrame, bytes, bytearray)):
+            return
+        base = self._base(key)
+        base.parent.mkdir(parents=True, exist_ok=True)
+
+        fd, tmp_name = tempfile.mkstemp(dir=base.parent, prefix=_TMP_PREFIX)
+        os.close(fd)
+        tmp = Path(tmp_name)
+        try:
+            suffix = _write(tmp, value)
+            if suffix is None:
+                _unlink(tmp)
+                return
+            size = tmp.stat().st_size
+            os.replace(tmp, base.with_suffix(suffix))
+        except OSError:
+            _unlink(tmp)
+            return
+
+        with self._lock:
+            self._puts += 1
+            if self._approx_bytes is not None:
+                self._approx_bytes += size
+            scan = (self._approx_bytes is None or self._approx_bytes > self.max_bytes
+                    or self._puts % EVICT_EVERY_PUTS == 0)
+        if scan:
+            self.evict()
+
+    def evict(self) -> None:
+        """
+        만료된 항목과 오래된 임시 파일을 지우고, 전체 크기가 한도를 넘으면 한도의 EVICT_TARGET_RATIO 까지
+        오래 쓰지 않은 항목부터 지웁니다.
+        """
+        now = time.time()
+        entries = []
+        total = 0
+        for path in self.root.glob('*/*'):
+            if path.suffix in _LEGACY_SUFFIXES:
+                _unlink(path)
+                continue
+            is_tmp = path.name.startswith(_TMP_PREFIX)
+            if not is_tmp and path.suffix not in _SUFFIXES:
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            if is_tmp:
+                if now - stat.st_mtime > TMP_MAX_AGE_SECONDS:
+                    _unlink(path)
+                continue
+            if now - stat.st_mtime > self.ttl_seconds:
+                _unlink(path)
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        entries.sort()
+        target = self.max_bytes * EVICT_TARGET_RATIO if total > self.max_bytes else self.max_bytes
+        for _, size, path in entries:
+            if total <= target:
+                break
+            _unlink(path)
+            total -= size
+        with self._lock:
+            self._approx_bytes = total
+
+    def clear(self) -> None:
+        for path in self.root.glob('*/*'):
+            _unlink(path)
+        with self._lock:
+            self._approx_bytes = 0
+
+
+def _write(path: Path, value: Any) -> Optional[str]:
+    """값을 path 에 쓰고, 최종 파일 확장자를 돌려줍니다. parquet 로 저장할 수 없으면 None."""
+    if isinstance(value, (bytes, bytearray)):
+        path.write_bytes(value)
+        return '.bin'
+    try:
+        value.to_parquet(path)
+    except Exception:
+        # pyarrow 가 없거나, 숫자와 '' 가 섞인 컬럼처럼 parquet 로 저장할 수 없으면 메모리 캐시에만 둡니다.
+        return None
+    return '.parquet'
+
+
+def _read(path: Path) -> Any:
+    if path.suffix == '.bin':
+        return path.read_bytes()
+    return pd.read_parquet(path)
+
+
+def _touch(path: Path) -> None:
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+
+def _unlink(path: Path) -> None:
+    try:
+        path.unlink()
+    except OSError:
+        pass
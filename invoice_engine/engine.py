@@ -0,0 +1,514 @@
+"""
+이카운트 '판매현황(거래처품목별-TAX1양식)' 데이터를 홈택스 대량 발행 양식으로 변환하는 엔진.
+
+Streamlit 등 UI 에 의존하지 않으므로 페이지, 배치 작업, 벤치마크에서 그대로 import 해서 사용합니다.
+변환 흐름은 하나이고, 품목 행을 세금계산서 한 줄로 펼치는(reshape) 단계만
+'scatter'(기본) / 'merge' / 'pivot' / 'group' 전략 중에서 선택할 수 있습니다.
+"""
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .bizno import BRANCH_SUFFIX, normalize_bizno
+from .dates import normalize_dates
+from .keys import compress_codes, factorize_keys, first_positions
+from .metrics import NO_TIMER, StageTimer
+from .rules import ItemRules, default_rules
+
+# 변환 결과가 달라지는 수정을 하면 올려 주세요. (캐시 키에 포함되어 이전 결과를 무효화)
+ENGINE_VERSION = '2.4'
+
+# 세금계산서 한 장을 구분하는 키 컬럼 (거래처별로 고유한 값을 가지는 열)
+KEY_COLUMNS = ['code', 'Date', 'TaxNo_Send', 'J1', 'Title_send', 'Name_send',
+               'Addr_send', 'sub1', 'sub2', 'Email_send',
+               'TaxNo_get', 'J2', 'TaxTitle_get', 'Name_get',
+               'Addr_get', 'type1', 'type2', 'Email_get', 'Email2_get', 'note_Sum']
+
+# 품목 칸(slot)마다 펼쳐지는 값 컬럼
+VALUE_COLUMNS = ['day', 'item', 'standard', 'quantity', 'unit_price', 'price', 'VAT', 'note']
+
+# 02 페이지(pivot)는 공급받는자 상호도 품목별로 함께 내보냅니다.
+PIVOT_VALUE_COLUMNS = VALUE_COLUMNS + ['Title_get']
+
+# 계산서 1장당 품목 칸 수 (기본값 / 홈택스 최대값)
+NUM_SLOTS = 4
+MAX_SLOTS = 16
+
+# 홈택스 양식의 품목 앞쪽 헤더 컬럼
+HEADER_COLUMNS = KEY_COLUMNS[:-1] + ['price_sum', 'VAT_sum', 'note_Sum']
+
+# 원 단위 정수 블록(계산서 × 품목 칸)으로 계산해 합계를 내는 금액 컬럼
+AMOUNT_COLUMNS = ['price', 'VAT']
+
+# 일반세금계산서(유형 01)의 세율과 품목당 허용 오차(원)
+VAT_RATE = 0.1
+VAT_TOLERANCE = 1
+
+# 내부 작업용 컬럼
+KEY_ID_COLUMN = '_key'
+SLOT_COLUMN = '_slot'
+DUP_COLUMN = '_dup'
+INVOICE_ID_COLUMN = '_invoice'
+
+
+def preprocess(df: pd.DataFrame, num_slots: int = NUM_SLOTS, pack_slots: bool = False,
+               rules: Optional[ItemRules] = None, timer: StageTimer = NO_TIMER,
+               value_columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    원본 데이터를 정리하고 각 행에 품목 칸 번호와 계산서 순번을 매깁니다.
+
+    원본은 수정하지 않습니다. 변환에 필요한 컬럼의 남길 행만 한 번에 모아 새 작업용 데이터프레임을 만들고,
+    값이 바뀌는 컬럼(작성일자, 등록번호 등)만 새로 계산합니다.
+
+    Args:
+        df (pd.DataFrame): 원본 이카운트 데이터프레임.
+        num_slots (int): 계산서 1장당 품목 칸 수.
+        pack_slots (bool): False 면 품목마다 규칙표의 고정 칸에 넣고,
+            True 면 규칙표의 칸 순서로 1번 칸부터 채우며 num_slots 를 넘는 품목은 다음 계산서로 넘깁니다.
+        rules (ItemRules, optional): 품목 칸 배정 규칙. 기본값은 item_rules.csv.
+        timer (StageTimer): 'preprocess' / 'filter' / 'split' 단계를 기록할 측정기.
+        value_columns (List[str], optional): 품목 칸마다 펼칠 컬럼. 원본에 없는 컬럼은 빈 칸으로 채웁니다.
+
+    Returns:
+        pd.DataFrame: 공급가액이 0보다 크고 품목 칸이 정해진 행만 남긴 작업용 데이터프레임.
+    """
+    if value_columns is None:
+        value_columns = VALUE_COLUMNS
+
+    with timer.stage('preprocess', rows_in=len(df)) as record:
+        # 1. 데이터 전처리
+        derived = derive_columns(df)
+
+        # 2. 규칙표로 품목 칸 지정 (규칙이 없거나 칸이 0 인 품목은 제외)
+        ranks, single = (rules or default_rules()).apply(derived['TaxNo_get'], df['item'])
+        record['rows_out'] = len(df)
+
+    with timer.stage('filter', rows_in=len(df)) as record:
+        # 3. 공급가액이 0보다 크고 품목 칸이 정해진 데이터만 선택
+        rows = np.flatnonzero((df['price'] > 0).to_numpy() & (ranks > 0))
+        ranks, single = ranks[rows], single[rows]
+
+        data = {}
+        for col in dict.fromkeys(KEY_COLUMNS + value_columns):
+            if col in derived:
+                data[col] = derived[col].array.take(rows)
+            elif col in df.columns and col != 'code':
+                data[col] = df[col].array.take(rows)
+        work = pd.DataFrame(data, index=df.index[rows])
+        work['code'] = '01'  # 유형: 01 (일반세금계산서)
+        # 원본 파일에 standard, quantity, unit_price 등이 없을 수 있으므로 빈 칸으로 추가
+        for col in value_columns:
+            if col not in work.columns:
+                work[col] = ''
+
+        # 키에 NaN 이 있으면 groupby/pivot 에서 행이 사라지므로 빈 문자열로 통일
+        work = fill_blank(work, KEY_COLUMNS)
+        record['rows_out'] = len(work)
+
+    with timer.stage('split', rows_in=len(work)) as record:
+        # 계산서 키(20개 컬럼)는 여기서 한 번만 정수 id 로 바꿔 이후 단계에서 재사용합니다.
+        key_ids, _ = factorize_keys(work, KEY_COLUMNS)
+        work[KEY_ID_COLUMN] = key_ids
+
+        # 4. 품목 칸 / 계산서 순번 배정
+        work[SLOT_COLUMN], work[DUP_COLUMN] = assign_slots(key_ids, ranks, single, num_slots, pack_slots)
+        record['rows_out'] = len(work)
+
+    return work
+
+
+def derive_columns(df: pd.DataFrame) -> Dict[str, pd.Series]:
+    """
+    원본에서 값을 바꿔 쓰는 컬럼(작성일자, 일자, 등록번호)을 계산합니다. (행 순서와 인덱스는 원본 그대로)
+
+    작성일자는 문자열/정수/날짜/엑셀 일련번호 어느 형태로 들어와도 'yyyymmdd' 로, 일자는 'dd' 로 통일합니다.
+
+    preprocess 와 대용량 변환의 파티션 나누기가 같은 키 값을 쓰도록 한 곳에서 계산합니다.
+    """
+    dates, days = normalize_dates(df['Date'])
+    return {
+        'Date': dates,
+        'day': days,
+        # 등록번호는 실수(2298500670.0)나 하이픈이 섞여 들어와도 같은 거래처가 같은 키가 되도록 정규화
+        'TaxNo_Send': normalize_bizno(df['TaxNo_Send']),
+        'TaxNo_get': normalize_bizno(df['TaxNo_get']),
+    }
+
+
+def assign_slots(key_ids: np.ndarray, ranks: np.ndarray, single: np.ndarray,
+                 num_slots: int = NUM_SLOTS, pack_slots: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    행마다 품목 칸 번호(1부터)와 같은 키 안에서의 계산서 순번(0부터)을 배열 연산으로 계산합니다.
+
+    Args:
+        key_ids (np.ndarray): 행별 계산서 키 id.
+        ranks (np.ndarray): 행별 품목 순위 (규칙표의 slot 값).
+        single (np.ndarray): 품목마다 별도 계산서로 발행할 행 (규칙표의 single, 예: 하나은행).
+        num_slots (int): 계산서 1장당 품목 칸 수.
+        pack_slots (bool): 빈 칸 없이 앞에서부터 채울지 여부.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (품목 칸 번호, 계산서 순번)
+    """
+    if not 1 <= num_slots <= MAX_SLOTS:
+        raise ValueError(f"품목 칸 수는 1~{MAX_SLOTS} 사이여야 합니다: {num_slots}")
+
+    single = np.asarray(single, dtype=bool)
+    shared = ~single
+    slots = np.empty(len(ranks), dtype=np.int64)
+    dups = np.empty(len(ranks), dtype=np.int64)
+
+    if not pack_slots:
+        if len(ranks) and ranks.max() > num_slots:
+            raise ValueError(f"고정 칸 방식에는 품목 칸이 {ranks.max()}개 이상 필요합니다: {num_slots}")
+        # 같은 계산서 키에 같은 칸의 품목이 여러 개면 n번째끼리 묶어 별도 계산서로 만듭니다.
+        slots[:] = ranks
+        dups[shared] = group_positions(key_ids[shared] * (num_slots + 1) + ranks[shared])
+    else:
+        # 키 안에서 품목 순위 → 원래 순서로 줄 세운 위치를 칸/계산서로 나눕니다.
+        positions = group_positions(key_ids[shared], ranks[shared])
+        slots[shared] = positions % num_slots + 1
+        dups[shared] = positions // num_slots
+        slots[single] = 1
+
+    if single.any():
+        # 별도 발행 행은 같은 키의 다른 품목이 쓴 계산서 다음 순번부터 한 장씩 차지합니다.
+        used = np.zeros(int(key_ids.max()) + 1, dtype=np.int64)
+        np.maximum.at(used, key_ids[shared], dups[shared] + 1)
+        dups[single] = used[key_ids[single]] + group_positions(key_ids[single], ranks[single])
+    return slots, dups
+
+
+def group_positions(group_codes: np.ndarray, order_codes: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    같은 그룹 안에서 각 행의 순번(0부터)을 계산합니다. (groupby().cumcount() 의 배열 버전)
+
+    order_codes 가 있으면 그룹 안에서 그 값 순서로, 같으면 원래 행 순서로 번호를 매깁니다.
+    """
+    n = len(group_codes)
+    if order_codes is None:
+        order = np.argsort(group_codes, kind='stable')
+    else:
+        order = np.lexsort((order_codes, group_codes))
+
+    sorted_codes = group_codes[order]
+    starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]]) if n else np.empty(0, np.int64)
+    run_starts = np.repeat(starts, np.diff(np.r_[starts, n]))
+
+    positions = np.empty(n, dtype=np.int64)
+    positions[order] = np.arange(n, dtype=np.int64) - run_starts
+    return positions
+
+
+def slot_columns(value_columns: List[str], num_slots: int = NUM_SLOTS) -> List[str]:
+    """품목 칸 순서대로 펼친 컬럼명 목록 (예: day_1, item_1, ..., note_4)."""
+    return [f'{col}_{i}' for i in range(1, num_slots + 1) for col in value_columns]
+
+
+def _finish_wide(wide: pd.DataFrame, value_columns: List[str], num_slots: int) -> pd.DataFrame:
+    """펼친 결과를 계산서 id 순으로 놓고, 빠진 품목 칸 컬럼을 채우고 작업용 컬럼을 제거합니다."""
+    wide = wide.sort_values(INVOICE_ID_COLUMN, kind='stable', ignore_index=True)
+    wide = wide.drop(columns=[DUP_COLUMN, INVOICE_ID_COLUMN])
+    return wide.reindex(columns=KEY_COLUMNS + slot_columns(value_columns, num_slots))
+
+
+def invoice_ids_of(df: pd.DataFrame) -> Tuple[np.ndarray, int]:
+    """
+    (키 id, 중복 순번) → 계산서 id. 키 id 순서를 유지하므로 id 순서는 키로 정렬된 순서입니다.
+
+    Returns:
+        Tuple[np.ndarray, int]: (행별 계산서 id, 계산서 수)
+    """
+    key_ids = df[KEY_ID_COLUMN].to_numpy(dtype=np.int64)
+    dups = df[DUP_COLUMN].to_numpy(dtype=np.int64)
+    return compress_codes(key_ids * (dups.max() + 1) + dups)
+
+
+def _with_invoice_ids(df: pd.DataFrame) -> Tuple[pd.DataFrame, np.ndarray, int]:
+    """
+    계산서 id 컬럼이 붙은 작업용 데이터프레임. convert_work 에서 이미 붙였으면 그대로 씁니다.
+
+    Returns:
+        Tuple[pd.DataFrame, np.ndarray, int]: (id 컬럼이 있는 데이터프레임, 행별 계산서 id, 계산서 수)
+    """
+    if INVOICE_ID_COLUMN in df.columns:
+        invoice_ids = df[INVOICE_ID_COLUMN].to_numpy(dtype=np.int64)
+        return df, invoice_ids, int(invoice_ids.max()) + 1 if len(invoice_ids) else 0
+    invoice_ids, n_invoices = invoice_ids_of(df)
+    return df.assign(**{INVOICE_ID_COLUMN: invoice_ids}), invoice_ids, n_invoices
+
+
+def _key_frame(df: pd.DataFrame, invoice_ids: np.ndarray, n_invoices: int) -> Dict[str, object]:
+    """계산서 키 컬럼을 계산서마다 첫 행에서 한 번의 take 로 가져옵니다."""
+    first = first_positions(invoice_ids, n_invoices)
+    return {col: df[col].array.take(first) for col in KEY_COLUMNS}
+
+
+def reshape_scatter(df: pd.DataFrame, value_columns: List[str], num_slots: int = NUM_SLOTS) -> pd.DataFrame:
+    """
+    계산서 id 와 품목 칸 번호로 위치를 계산해, (계산서 × 품목 칸) 행 위치 표에 한 번에 흩어 넣습니다.
+
+    키 컬럼은 preprocess 에서 만든 정수 id 만 사용하므로 문자열 해시/조인이 없고
+    처리 시간이 행 수에 비례합니다. 값 컬럼은 행 위치 표로 take 하므로 원래 dtype 을 유지합니다.
+    """
+    df, invoice_ids, n_invoices = _with_invoice_ids(df)
+    slots = df[SLOT_COLUMN].to_numpy(dtype=np.int64)
+
+    # 품목 칸마다 어느 원본 행이 들어가는지 기록 (-1 은 빈 칸)
+    slot_rows = np.full((n_invoices, num_slots), -1, dtype=np.int64)
+    slot_rows[invoice_ids, slots - 1] = np.arange(len(df), dtype=np.int64)
+    _check_slots_unique(int(np.count_nonzero(slot_rows >= 0)), len(df))
+
+    data = _key_frame(df, invoice_ids, n_invoices)
+
+    for i in range(1, num_slots + 1):
+        rows = slot_rows[:, i - 1]
+        for col in value_columns:
+            data[f'{col}_{i}'] = df[col].array.take(rows, allow_fill=True)
+
+    return pd.DataFrame(data, columns=KEY_COLUMNS + slot_columns(value_columns, num_slots))
+
+
+def reshape_merge(df: pd.DataFrame, value_columns: List[str], num_slots: int = NUM_SLOTS) -> pd.DataFrame:
+    """
+    품목 칸별 데이터프레임을 계산서 키 기준으로 외부 조인하여 펼칩니다. (01, 03 페이지 방식)
+    """
+    # 계산서 id 는 (키, 순번)마다 하나이므로 조인 결과는 같고, 결과를 id 순으로 놓는 데 씁니다.
+    df, _, _ = _with_invoice_ids(df)
+    join_keys = KEY_COLUMNS + [DUP_COLUMN, INVOICE_ID_COLUMN]
+
+    merged_df = None
+    for i in range(1, num_slots + 1):
+        part = df.loc[df[SLOT_COLUMN] == i, join_keys + value_columns]
+        part = part.rename(columns={col: f'{col}_{i}' for col in value_columns})
+        if merged_df is None:
+            merged_df = part
+        else:
+            merged_df = pd.merge(merged_df, part, on=join_keys, how='outer')
+
+    return _finish_wide(merged_df, value_columns, num_slots)
+
+
+def reshape_pivot(df: pd.DataFrame, value_columns: List[str], num_slots: int = NUM_SLOTS) -> pd.DataFrame:
+    """
+    pivot_table 로 품목 칸 번호를 열로 올려 펼칩니다. (02 페이지 방식)
+
+    20개 키 컬럼 대신 정수 계산서 id 하나를 인덱스로 피벗하고,
+    키 컬럼은 피벗 후 계산서마다 첫 행에서 한 번에 붙입니다.
+    """
+    df, invoice_ids, n_invoices = _with_invoice_ids(df)
+
+    wide = df.pivot_table(
+        index=invoice_ids,
+        columns=SLOT_COLUMN,
+        values=value_columns,
+        aggfunc='first'  # (계산서, 칸)마다 하나의 값만 존재하므로 'first' 사용
+    )
+    # 다중 레벨 컬럼을 단일 레벨로 변환 (예: ('price', 1) -> 'price_1')
+    wide.columns = [f'{val}_{num}' for val, num in wide.columns]
+    wide = wide.reindex(index=np.arange(n_invoices), columns=slot_columns(value_columns, num_slots))
+
+    data = _key_frame(df, invoice_ids, n_invoices)
+    data.update({col: wide[col].array for col in wide.columns})
+    return pd.DataFrame(data, columns=KEY_COLUMNS + slot_columns(value_columns, num_slots))
+
+
+def reshape_group(df: pd.DataFrame, value_columns: List[str], num_slots: int = NUM_SLOTS) -> pd.DataFrame:
+    """
+    (계산서 키, 품목 칸) 인덱스를 unstack 하여 펼칩니다.
+    """
+    df, _, _ = _with_invoice_ids(df)
+    wide = df.set_index(KEY_COLUMNS + [DUP_COLUMN, INVOICE_ID_COLUMN, SLOT_COLUMN])[value_columns].unstack(SLOT_COLUMN)
+    wide.columns = [f'{val}_{num}' for val, num in wide.columns]
+    return _finish_wide(wide.reset_index(), value_columns, num_slots)
+
+
+STRATEGIES: Dict[str, Callable[[pd.DataFrame, List[str], int], pd.DataFrame]] = {
+    'scatter': reshape_scatter,
+    'merge': reshape_merge,
+    'pivot': reshape_pivot,
+    'group': reshape_group,
+}
+
+
+class SlotAmounts(NamedTuple):
+    """(계산서 × 품목 칸) 금액 블록. 원 단위 int64 이고, 품목이 없는 칸은 0 입니다."""
+    price: np.ndarray
+    vat: np.ndarray
+    # 품목이 들어 있는 칸
+    filled: np.ndarray
+
+
+def round_won(values: pd.Series) -> np.ndarray:
+    """
+    금액을 원 단위 int64 로 반올림합니다. (0.5원은 0 에서 먼 쪽으로, 빈 값이나 숫자가 아닌 값은 0)
+    """
+    if pd.api.types.is_integer_dtype(values.dtype) and not values.hasnans:
+        return values.to_numpy(dtype=np.int64)
+    amounts = pd.to_numeric(values, errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+    amounts = np.nan_to_num(amounts, nan=0.0, posinf=0.0, neginf=0.0)
+    return (np.sign(amounts) * np.floor(np.abs(amounts) + 0.5)).astype(np.int64)
+
+
+def slot_amounts(df: pd.DataFrame, invoice_ids: np.ndarray, n_invoices: int,
+                 num_slots: int = NUM_SLOTS) -> SlotAmounts:
+    """
+    preprocess 결과의 공급가액/세액을 (계산서 × 품목 칸) 정수 블록에 한 번에 흩어 넣습니다.
+
+    블록은 열(품목 칸) 단위로 연속된 메모리에 두어, 칸마다 복사 없이 결과 컬럼으로 씁니다.
+    """
+    slots = df[SLOT_COLUMN].to_numpy(dtype=np.int64) - 1
+    blocks = []
+    for col in AMOUNT_COLUMNS:
+        block = np.zeros((n_invoices, num_slots), dtype=np.int64, order='F')
+        block[invoice_ids, slots] = round_won(df[col])
+        blocks.append(block)
+    filled = np.zeros((n_invoices, num_slots), dtype=bool, order='F')
+    filled[invoice_ids, slots] = True
+    _check_slots_unique(int(np.count_nonzero(filled)), len(df))
+    return SlotAmounts(*blocks, filled)
+
+
+def _check_slots_unique(filled: int, rows: int) -> None:
+    """(계산서, 품목 칸)마다 품목이 하나인지 확인합니다. 겹치면 품목을 조용히 덮어쓰지 않고 오류를 냅니다."""
+    if filled != rows:
+        raise ValueError(f"품목 칸 배정이 겹쳐 {rows - filled}개 품목이 같은 계산서의 같은 칸에 배정되었습니다.")
+
+
+def calculate_totals(df: pd.DataFrame, amounts: SlotAmounts, value_columns: List[str]) -> pd.DataFrame:
+    """
+    금액 블록으로 공급가액/세액 합계(price_sum, VAT_sum)를 계산하고, 펼친 값 컬럼에 있는 금액 컬럼을
+    품목 칸별 정수 컬럼(Int64, 빈 칸은 값 없음)으로 붙입니다.
+
+    합계는 원 단위로 반올림한 품목 금액을 그대로 더하므로 품목 칸 금액의 합과 정확히 같습니다.
+    (df 는 계산서 id 순서의 펼친 결과)
+    """
+    columns = {}
+    blocks = {'price': amounts.price, 'VAT': amounts.vat}
+    for i in range(amounts.filled.shape[1]):
+        empty = ~amounts.filled[:, i]
+        for col in AMOUNT_COLUMNS:
+            if col in value_columns:
+                columns[f'{col}_{i + 1}'] = pd.arrays.IntegerArray(blocks[col][:, i], empty)
+
+    columns['price_sum'] = amounts.price.sum(axis=1)
+    columns['VAT_sum'] = amounts.vat.sum(axis=1)
+    return df.assign(**columns)
+
+
+def vat_mismatches(df: pd.DataFrame, rate: float = VAT_RATE, tolerance: float = VAT_TOLERANCE) -> np.ndarray:
+    """
+    변환 결과에서 세액 합계가 공급가액 합계 × 세율과 (품목 수 × 허용 오차)원 넘게 다른 계산서. (bool 배열)
+    """
+    price_cols = [c for c in df.columns if c.startswith('price_') and c[len('price_'):].isdigit()]
+    items = np.zeros(len(df), dtype=np.int64)
+    for col in price_cols:
+        items += df[col].notna().to_numpy()
+    price_sum = df['price_sum'].to_numpy(dtype=np.int64)
+    vat_sum = df['VAT_sum'].to_numpy(dtype=np.int64)
+    return np.abs(vat_sum - price_sum * rate) > tolerance * np.maximum(items, 1)
+
+
+def format_final_output(df: pd.DataFrame, value_columns: List[str], num_slots: int = NUM_SLOTS) -> pd.DataFrame:
+    """
+    홈택스 양식에 맞게 최종 출력 포맷을 설정합니다.
+
+    바뀌거나 새로 생기는 컬럼만 만들고 나머지 컬럼은 복사하지 않고 그대로 가져옵니다.
+    """
+    # 추가 데이터 정리
+    extra = {f'note_{i}': '' for i in range(1, num_slots + 1)}
+
+    # 기타 필드 추가
+    extra.update(etc1='', etc2='', etc3='', etc4='', etc5='02')  # 청구(02)
+
+    # 사업자번호 정리
+    extra['TaxNo_get'] = df['TaxNo_get'].str.replace(BRANCH_SUFFIX, '', regex=False)
+
+    df_final = df[HEADER_COLUMNS + slot_columns(value_columns, num_slots)].assign(**extra)
+
+    # NaN 값을 빈 문자열로 변환 (금액 컬럼은 빈 칸이 값 없음인 정수 컬럼 그대로 두고, 엑셀에 쓸 때 빈 셀로 씀)
+    amount_columns = set(slot_columns([c for c in AMOUNT_COLUMNS if c in value_columns], num_slots))
+    return fill_blank(df_final, [c for c in df_final.columns if c not in amount_columns])
+
+
+def fill_blank(df: pd.DataFrame, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    NaN 을 빈 문자열로 채웁니다. 범주형 컬럼은 범주형을 유지한 채 '' 범주를 추가해 채웁니다.
+
+    빈 값이 있는 컬럼만 새로 만들고, 나머지 컬럼은 복사하지 않은 새 데이터프레임을 돌려줍니다. (원본은 그대로)
+
+    Args:
+        columns (List[str], optional): 채울 컬럼. 기본값은 모든 컬럼.
+    """
+    filled = {}
+    for col in (df.columns if columns is None else columns):
+        values = df[col]
+        if not values.hasnans:
+            continue
+        if isinstance(values.dtype, pd.CategoricalDtype) and '' not in values.cat.categories:
+            values = values.cat.add_categories('')
+        filled[col] = values.fillna('')
+    return df.assign(**filled) if filled else df
+
+
+def process_ecount_file(df: pd.DataFrame, strategy: str = 'scatter',
+                        value_columns: Optional[List[str]] = None,
+                        num_slots: int = NUM_SLOTS, pack_slots: bool = False,
+                        rules: Optional[ItemRules] = None, timer: StageTimer = NO_TIMER) -> pd.DataFrame:
+    """
+    이카운트 엑셀 파일을 홈택스 업로드 양식으로 변환합니다.
+
+    Args:
+        df (pd.DataFrame): 원본 이카운트 데이터프레임. (수정하지 않으므로 복사본을 넘길 필요가 없습니다)
+        strategy (str): 품목 펼치기 방식. 'scatter'(기본), 'merge', 'pivot', 'group' 중 하나.
+        value_columns (List[str], optional): 품목 칸마다 펼칠 컬럼. 기본값은 VALUE_COLUMNS.
+        num_slots (int): 계산서 1장당 품목 칸 수 (최대 MAX_SLOTS).
+        pack_slots (bool): 품목을 1번 칸부터 빈 칸 없이 채우고, 넘치는 품목은 계산서를 추가해 발행.
+        rules (ItemRules, optional): 품목 칸 배정 규칙. 기본값은 패키지의 item_rules.csv.
+        timer (StageTimer): 단계별 시간/행 수/메모리를 기록할 측정기. 기본값은 측정하지 않음.
+
+    Returns:
+        pd.DataFrame: 변환된 홈택스 양식의 데이터프레임.
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"알 수 없는 변환 방식입니다: {strategy} (사용 가능: {', '.join(STRATEGIES)})")
+    if value_columns is None:
+        value_columns = VALUE_COLUMNS
+
+    work = preprocess(df, num_slots, pack_slots, rules, timer, value_columns)
+    return convert_work(work, strategy, value_columns, num_slots, timer)
+
+
+def convert_work(df: pd.DataFrame, strategy: str = 'scatter', value_columns: Optional[List[str]] = None,
+                 num_slots: int = NUM_SLOTS, timer: StageTimer = NO_TIMER) -> pd.DataFrame:
+    """
+    preprocess 결과(전체 또는 일부 계산서의 행)를 펼치고 합계/서식을 적용해 홈택스 양식으로 만듭니다.
+
+    계산서 단위로 나눈 행 묶음마다 따로 호출해도 결과를 이어 붙이면 전체를 한 번에 변환한 것과 같습니다.
+    결과 행은 계산서 id 순서(키로 정렬한 순서)이고, 공급가액/세액은 원 단위 정수(Int64) 컬럼입니다.
+    """
+    if value_columns is None:
+        value_columns = VALUE_COLUMNS
+
+    # 금액 컬럼은 펼치지 않고 정수 블록으로 따로 계산하므로, 펼치기 전에 계산서 id 를 한 번 붙여 둡니다.
+    invoice_ids, n_invoices = invoice_ids_of(df) if len(df) else (np.empty(0, dtype=np.int64), 0)
+    df = df.assign(**{INVOICE_ID_COLUMN: invoice_ids})
+    reshape_columns = [c for c in value_columns if c not in AMOUNT_COLUMNS]
+
+    with timer.stage('reshape', rows_in=len(df)) as record:
+        if df.empty:
+            merged_df = pd.DataFrame(columns=KEY_COLUMNS + slot_columns(reshape_columns, num_slots))
+        else:
+            merged_df = STRATEGIES[strategy](df, reshape_columns, num_slots)
+        record['rows_out'] = len(merged_df)
+
+    with timer.stage('totals', rows_in=len(merged_df)) as record:
+        amounts = slot_amounts(df, invoice_ids, n_invoices, num_slots)
+        merged_df = calculate_totals(merged_df, amounts, value_columns)
+        record['rows_out'] = len(merged_df)
+
+    with timer.stage('format', rows_in=len(merged_df)) as record:
+        final_df = format_final_output(merged_df, value_columns, num_slots)
+        record['rows_out'] = len(final_df)
+    return final_df
@@ -0,0 +1,249 @@
+"""
+변환 전략(scatter / merge / pivot / group)의 결과가 같은지 확인하는 비교 도구.
+
+전략마다 정수/실수, 범주형/문자열 같은 dtype 이나 행 순서가 다를 수 있으므로
+결과를 표준 형태(모든 값을 문자열로, 키 순으로 정렬)로 바꾼 CSV 바이트를 비교하고,
+홈택스 업로드 엑셀(write_hometax_excel)로 쓴 내용도 바이트 단위로 비교합니다.
+또 전처리 후 남은 품목 행의 공급가액/세액 합계가 결과의 합계와 같은지(사라지거나 겹친 품목이 없는지) 확인합니다.
+가상 데이터와 실제 이카운트 파일 모두에 대해 여러 변환 옵션 조합을 검사합니다.
+
+전략끼리 같아도 모두 함께 바뀌었을 수 있으므로, 기준 전략 결과의 sha256 을 golden_digests.csv 에 기록된
+골든 결과와도 비교합니다. (기록이 없는 입력/옵션은 건너뜀) 결과가 의도적으로 바뀌었으면 --update-golden 으로
+다시 기록합니다.
+
+사용 예:
+    python -m invoice_engine.equivalence test_input.xlsx    # 실제 파일 + 가상 데이터 1k, 30k 행
+    python -m invoice_engine.equivalence test_input.xlsx --sizes 100k
+    python -m invoice_engine.equivalence test_input.xlsx --update-golden
+"""
+import argparse
+import hashlib
+import io
+import sys
+import zipfile
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .canonical import canonical_values
+from .engine import PIVOT_VALUE_COLUMNS, STRATEGIES, preprocess, process_ecount_file, round_won
+from .excel_io import read_ecount_excel
+from .hometax_writer import to_hometax_excel
+from .rules import ItemRules, default_rules
+from .synthetic import synthetic_ecount
+
+REFERENCE_STRATEGY = 'scatter'
+
+# 한 계산서 키 안에 별도 발행 품목(관리비)과 함께 묶는 품목이 섞이는 규칙표
+MIXED_SINGLE_RULES = ItemRules([('*', '관리비', 2, True)] + default_rules().rules)
+
+# 비교할 변환 옵션 조합 (이름 -> process_ecount_file 옵션)
+OPTION_SETS: Dict[str, Dict] = {
+    'default': {},
+    'pivot_columns': {'value_columns': PIVOT_VALUE_COLUMNS},
+    'pack_2': {'num_slots': 2, 'pack_slots': True},
+    'slots_6': {'num_slots': 6},
+    'single_mixed': {'rules': MIXED_SINGLE_RULES},
+    'single_mixed_pack_2': {'num_slots': 2, 'pack_slots': True, 'rules': MIXED_SINGLE_RULES},
+}
+
+# 저장 시각이 들어 있어 저장할 때마다 달라지는 xlsx 부분 (비교에서 제외)
+XLSX_VOLATILE_PARTS = {'docProps/core.xml'}
+
+DEFAULT_SIZES = '1k,30k'
+
+# 기준 전략 결과의 골든 sha256 (source, options, sha256). 실제 파일의 source 는 파일 이름입니다.
+GOLDEN_PATH = Path(__file__).with_name('golden_digests.csv')
+
+
+class Mismatch(NamedTuple):
+    source: str
+    options: str
+    strategy: str
+    detail: str
+
+
+def canonical_output(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    변환 결과를 비교용 표준 형태로 바꿉니다.
+
+    - 값: 빈 값(NaN/None)은 '', 정수로 표현되는 실수는 정수 문자열 (3130000.0 -> '3130000'), 나머지는 str()
+    - 행: 모든 컬럼 값 순으로 정렬하고 인덱스를 0부터 다시 매김
+    """
+    canonical = canonical_values(df)
+    return canonical.sort_values(list(canonical.columns), kind='stable', ignore_index=True)
+
+
+def canonical_bytes(df: pd.DataFrame) -> bytes:
+    """표준 형태의 결과를 CSV 바이트로. (컬럼명과 순서까지 같아야 같은 바이트)"""
+    return canonical_output(df).to_csv(index=False, lineterminator='\n').encode('utf-8')
+
+
+def xlsx_parts(data: bytes) -> Dict[str, bytes]:
+    """xlsx(zip) 안의 파일별 내용. 저장 시각만 다른 두 파일은 같은 값이 됩니다."""
+    with zipfile.ZipFile(io.BytesIO(data)) as zf:
+        return {name: zf.read(name) for name in zf.namelist() if name not in XLSX_VOLATILE_PARTS}
+
+
+def check_totals(df: pd.DataFrame, result: pd.DataFrame, options: Dict) -> Optional[str]:
+    """
+    전처리 후 남은 품목 행의 공급가액/세액 합계와 결과의 price_sum/VAT_sum 합계를 비교합니다.
+
+    Returns:
+        Optional[str]: 다르면 차이 설명, 같으면 None.
+    """
+    work = preprocess(df, **options)
+    for col, total in (('price', 'price_sum'), ('VAT', 'VAT_sum')):
+        expected, actual = int(round_won(work[col]).sum()), int(result[total].sum())
+        if expected != actual:
+            return f'{col} 합계가 입력과 다릅니다 ({expected} != {actual}, 차이 {expected - actual})'
+    return None
+
+
+def compare_strategies(df: pd.DataFrame, source: str = '', strategies: Optional[List[str]] = None,
+                       option_sets: Optional[Dict[str, Dict]] = None,
+                       golden: Optional[Dict[str, str]] = None) -> List[Mismatch]:
+    """
+    같은 입력을 모든 전략으로 변환해 기준 전략(scatter)의 결과와 바이트 단위로 비교합니다.
+
+    표준 형태 CSV 와 홈택스 업로드 엑셀 내용을 모두 비교하고, 기준 결과를 포함한 모든 결과의
+    금액 합계가 입력과 같은지도 확인합니다.
+
+    Args:
+        df (pd.DataFrame): 원본 이카운트 데이터프레임.
+        source (str): 결과 보고에 쓸 입력 이름.
+        strategies (List[str], optional): 비교할 전략. 기본값은 모든 전략.
+        option_sets (Dict[str, Dict], optional): 옵션 조합. 기본값은 OPTION_SETS.
+        golden (Dict[str, str], optional): 옵션 조합 이름 -> 기준 결과의 골든 sha256. 없는 조합은 비교하지 않습니다.
+
+    Returns:
+        List[Mismatch]: 기준과 다른 결과 목록 (비어 있으면 모두 같음).
+    """
+    strategies = strategies or sorted(STRATEGIES)
+    mismatches = []
+    for name, options in (option_sets or OPTION_SETS).items():
+        try:
+            reference = process_ecount_file(df, strategy=REFERENCE_STRATEGY, **options)
+        except Exception as e:
+            mismatches.append(Mismatch(source, name, REFERENCE_STRATEGY, f'오류: {e!r}'))
+            continue
+        expected = canonical_bytes(reference)
+        if golden and name in golden and hashlib.sha256(expected).hexdigest() != golden[name]:
+            mismatches.append(Mismatch(source, name, REFERENCE_STRATEGY, '골든 결과(golden_digests.csv)와 다릅니다'))
+        expected_xlsx = xlsx_parts(to_hometax_excel(reference))
+        difference = check_totals(df, reference, options)
+        if difference:
+            mismatches.append(Mismatch(source, name, REFERENCE_STRATEGY, difference))
+
+        for strategy in strategies:
+            if strategy == REFERENCE_STRATEGY:
+                continue
+            try:
+                result = process_ecount_file(df, strategy=strategy, **options)
+            except Exception as e:
+                mismatches.append(Mismatch(source, name, strategy, f'오류: {e!r}'))
+                continue
+            if canonical_bytes(result) != expected:
+                mismatches.append(Mismatch(source, name, strategy, describe_difference(reference, result)))
+            elif xlsx_parts(to_hometax_excel(result)) != expected_xlsx:
+                mismatches.append(Mismatch(source, name, strategy, '표준 형태는 같지만 업로드 엑셀 내용이 다릅니다'))
+            difference = check_totals(df, result, options)
+            if difference:
+                mismatches.append(Mismatch(source, name, strategy, difference))
+    return mismatches
+
+
+def describe_difference(expected: pd.DataFrame, actual: pd.DataFrame) -> str:
+    """두 결과의 첫 번째 차이를 설명합니다."""
+    if list(expected.columns) != list(actual.columns):
+        missing = [c for c in expected.columns if c not in actual.columns]
+        extra = [c for c in actual.columns if c not in expected.columns]
+        return f'컬럼이 다릅니다 (없음: {missing}, 추가: {extra}, 순서 차이 포함)'
+    if len(expected) != len(actual):
+        return f'행 수가 다릅니다 ({len(expected)} != {len(actual)})'
+
+    left, right = canonical_output(expected), canonical_output(actual)
+    diff = (left != right).to_numpy()
+    row, col = map(int, np.argwhere(diff)[0])
+    column = left.columns[col]
+    return f'{row}번째 행 {column}: {left.iat[row, col]!r} != {right.iat[row, col]!r} (다른 칸 {int(diff.sum())}개)'
+
+
+def digest(df: pd.DataFrame) -> str:
+    """표준 형태 결과의 sha256 (골든 결과 기록용)."""
+    return hashlib.sha256(canonical_bytes(df)).hexdigest()
+
+
+def load_golden(path: Path = GOLDEN_PATH) -> Dict[Tuple[str, str], str]:
+    """골든 결과 파일을 (source, options) -> sha256 으로 읽습니다. 파일이 없으면 빈 dict."""
+    if not path.exists():
+        return {}
+    table = pd.read_csv(path, dtype=str)
+    return dict(zip(zip(table['source'], table['options']), table['sha256']))
+
+
+def save_golden(golden: Dict[Tuple[str, str], str], path: Path = GOLDEN_PATH) -> None:
+    table = pd.DataFrame([(source, options, sha) for (source, options), sha in sorted(golden.items())],
+                         columns=['source', 'options', 'sha256'])
+    table.to_csv(path, index=False, lineterminator='\n')
+
+
+def reference_digests(df: pd.DataFrame, option_sets: Optional[Dict[str, Dict]] = None) -> Dict[str, str]:
+    """옵션 조합마다 기준 전략 결과의 digest."""
+    return {name: digest(process_ecount_file(df, strategy=REFERENCE_STRATEGY, **options))
+            for name, options in (option_sets or OPTION_SETS).items()}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog='python -m invoice_engine.equivalence',
+        description='모든 변환 전략의 홈택스 결과가 같은지 가상 데이터와 실제 파일로 확인합니다.')
+    parser.add_argument('inputs', nargs='*', type=Path, help='함께 검사할 이카운트 엑셀 파일')
+    parser.add_argument('--sizes', default=DEFAULT_SIZES,
+                        help=f'가상 데이터 행 수, 쉼표로 구분, 빈 값이면 생략 (기본값: {DEFAULT_SIZES})')
+    parser.add_argument('--seeds', type=int, default=2, help='크기마다 만들 가상 데이터 수 (기본값: 2)')
+    parser.add_argument('--update-golden', action='store_true',
+                        help=f'검사한 입력의 기준 결과로 {GOLDEN_PATH.name} 을 다시 기록 (결과가 의도적으로 바뀐 경우)')
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from .benchmark import parse_size
+
+    args = build_parser().parse_args(argv)
+
+    # 골든 결과는 실제 파일의 경우 경로가 아닌 파일 이름으로 찾습니다.
+    sources = [(str(path), path.name, lambda path=path: read_ecount_excel(path)) for path in args.inputs]
+    for size in [parse_size(s) for s in args.sizes.split(',') if s.strip()]:
+        for seed in range(args.seeds):
+            name = f'synthetic n={size} seed={seed}'
+            sources.append((name, name, lambda size=size, seed=seed: synthetic_ecount(size, seed)))
+
+    golden = load_golden()
+    mismatches = []
+    for source, golden_source, load in sources:
+        df = load()
+        if args.update_golden:
+            golden.update({(golden_source, name): sha for name, sha in reference_digests(df).items()})
+            print(f'[기록] {source}')
+            continue
+        expected = {name: sha for (s, name), sha in golden.items() if s == golden_source}
+        found = compare_strategies(df, source, golden=expected)
+        mismatches.extend(found)
+        checked = '' if expected else ' (골든 결과 없음)'
+        print(f"[{'다름' if found else '같음'}] {source}{checked}")
+        for m in found:
+            print(f'    {m.options} / {m.strategy}: {m.detail}')
+
+    if args.update_golden:
+        save_golden(golden)
+        print(f'{len(sources)}개 입력의 골든 결과를 {GOLDEN_PATH} 에 기록했습니다.')
+        return 0
+    print(f'{len(sources)}개 입력, 불일치 {len(mismatches)}건')
+    return 1 if mismatches else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
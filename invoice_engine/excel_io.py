@@ -0,0 +1,172 @@
+"""
+이카운트 엑셀 읽기.
+"""
+import zipfile
+from collections import deque
+from typing import Any, Dict, Iterator, List, Optional
+
+import openpyxl
+import pandas as pd
+from openpyxl.utils.exceptions import InvalidFileException
+
+# 이카운트 양식: 1행은 회사명/기간, 2행이 컬럼명, 마지막 2행은 총합계/출력일시
+ECOUNT_SKIP_ROWS = 1
+ECOUNT_FOOTER_ROWS = 2
+
+# 고유값이 행 수의 이 비율 이하인 문자열 컬럼은 범주형(category)으로 읽습니다.
+# (공급자 상호/주소/이메일처럼 모든 행에 거의 같은 값이 반복되는 컬럼)
+CATEGORY_MAX_RATIO = 0.5
+
+
+def read_ecount_excel(source) -> pd.DataFrame:
+    """
+    이카운트 '판매현황(거래처품목별-TAX1양식)' 엑셀 파일을 읽습니다.
+
+    xlsx 는 openpyxl read_only 모드로 행을 하나씩 읽어 컬럼별 배열에 바로 쌓으므로
+    워크북 전체나 행 목록을 메모리에 올리지 않습니다. (xls 는 pd.read_excel 사용)
+
+    Args:
+        source: 파일 경로 또는 파일 객체 (st.file_uploader 결과 포함).
+
+    Returns:
+        pd.DataFrame: 첫 행(회사명)과 마지막 2개 행(총합계, 출력일시)을 제외한 데이터.
+    """
+    try:
+        wb = openpyxl.load_workbook(source, read_only=True, data_only=True)
+    except (InvalidFileException, zipfile.BadZipFile):
+        if hasattr(source, 'seek'):
+            source.seek(0)
+        return pd.read_excel(source, skiprows=ECOUNT_SKIP_ROWS, skipfooter=ECOUNT_FOOTER_ROWS, header=0)
+
+    try:
+        ws = wb.worksheets[0]
+        ws.reset_dimensions()  # 저장된 시트 크기 정보가 틀린 파일도 끝까지 읽도록
+        return _read_ecount_rows(ws.iter_rows(min_row=ECOUNT_SKIP_ROWS + 1, values_only=True))
+    finally:
+        wb.close()
+
+
+def iter_ecount_excel(source, chunk_rows: int) -> Iterator[pd.DataFrame]:
+    """
+    이카운트 엑셀 파일을 chunk_rows 행씩 나눈 데이터프레임으로 차례로 읽습니다. (메모리보다 큰 파일용)
+
+    각 조각의 인덱스는 파일 전체에서의 행 번호(0부터)를 이어 받으므로, 검증 결과의 행 번호가
+    한 번에 읽었을 때와 같습니다. 컬럼 타입(숫자형/범주형)은 조각마다 따로 정해집니다.
+    xls 는 나눠 읽을 수 없어 한 번에 읽은 뒤 나눕니다.
+
+    Args:
+        source: 파일 경로 또는 파일 객체.
+        chunk_rows (int): 조각 하나의 최대 행 수.
+    """
+    try:
+        wb = openpyxl.load_workbook(source, read_only=True, data_only=True)
+    except (InvalidFileException, zipfile.BadZipFile):
+        if hasattr(source, 'seek'):
+            source.seek(0)
+        df = pd.read_excel(source, skiprows=ECOUNT_SKIP_ROWS, skipfooter=ECOUNT_FOOTER_ROWS, header=0)
+        for start in range(0, max(len(df), 1), chunk_rows):
+            yield df.iloc[start:start + chunk_rows]
+        return
+
+    try:
+        ws = wb.worksheets[0]
+        ws.reset_dimensions()
+        yield from _iter_ecount_frames(ws.iter_rows(min_row=ECOUNT_SKIP_ROWS + 1, values_only=True), chunk_rows)
+    finally:
+        wb.close()
+
+
+def _read_ecount_rows(rows) -> pd.DataFrame:
+    """
+    (컬럼명 행, 데이터 행..., 꼬리 2행) 순서의 행 스트림을 데이터프레임으로 만듭니다.
+    """
+    return next(_iter_ecount_frames(rows), pd.DataFrame())
+
+
+def _iter_ecount_frames(rows, chunk_rows: Optional[int] = None) -> Iterator[pd.DataFrame]:
+    """
+    행 스트림을 chunk_rows 행씩 데이터프레임으로 만듭니다. chunk_rows 가 없으면 전체를 하나로 만듭니다.
+    """
+    header = None
+    for row in rows:
+        if not _is_blank(row):
+            header = _header_names(row)
+            break
+    if header is None:
+        return
+
+    width = len(header)
+    columns: List[List[Any]] = [[] for _ in range(width)]
+    start = 0
+
+    # 마지막 2행(꼬리)을 미리 알 수 없으므로 2행만큼 늦게 컬럼에 반영합니다.
+    pending = deque()
+    for row in rows:
+        if _is_blank(row):
+            continue
+        pending.append(row)
+        if len(pending) > ECOUNT_FOOTER_ROWS:
+            _append_row(columns, pending.popleft(), width)
+            if chunk_rows and len(columns[0]) >= chunk_rows:
+                yield _columns_frame(header, columns, start)
+                start += len(columns[0])
+                columns = [[] for _ in range(width)]
+
+    if columns[0] or start == 0:
+        yield _columns_frame(header, columns, start)
+
+
+def _columns_frame(header: List[str], columns: List[List[Any]], start: int) -> pd.DataFrame:
+    data: Dict[str, pd.Series] = {name: _to_typed_array(values) for name, values in zip(header, columns)}
+    frame = pd.DataFrame(data, columns=header)
+    if start:
+        frame.index = pd.RangeIndex(start, start + len(frame))
+    return frame
+
+
+def _is_blank(row) -> bool:
+    return all(value is None or value == '' for value in row)
+
+
+def _header_names(row) -> List[str]:
+    """컬럼명 행에서 끝쪽 빈 칸을 제외하고, 중간 빈 칸은 pd.read_excel 처럼 'Unnamed: i'로 채웁니다."""
+    names = list(row)
+    while names and (names[-1] is None or names[-1] == ''):
+        names.pop()
+    return [f'Unnamed: {i}' if name is None or name == '' else str(name) for i, name in enumerate(names)]
+
+
+def _append_row(columns: List[List[Any]], row, width: int) -> None:
+    for i in range(width):
+        value = row[i] if i < len(row) else None
+        columns[i].append(None if value == '' else value)
+
+
+def _to_typed_array(values: List[Any]) -> pd.Series:
+    """
+    컬럼 값 목록을 한 번에 타입이 있는 배열로 변환합니다.
+    (pd.read_excel 과 같이 숫자로만 이루어진 문자열 컬럼은 숫자형, 반복이 많은 문자열 컬럼은 범주형으로 변환)
+    """
+    series = pd.Series(values, dtype=object)
+    try:
+        return pd.to_numeric(series)
+    except (ValueError, TypeError):
+        pass
+
+    series = series.infer_objects()
+    if pd.api.types.is_string_dtype(series.dtype):
+        return _maybe_categorical(series)
+    return series
+
+
+def _maybe_categorical(series: pd.Series) -> pd.Series:
+    """
+    고유값이 적은 문자열 컬럼을 범주형으로 바꿉니다. 범주는 정렬해 두어 키 정렬 순서가 문자열일 때와 같습니다.
+    """
+    try:
+        codes, uniques = pd.factorize(series, sort=True)
+    except TypeError:
+        return series
+    if len(uniques) > len(series) * CATEGORY_MAX_RATIO:
+        return series
+    return pd.Series(pd.Categorical.from_codes(codes, categories=uniques), index=series.index)
@@ -0,0 +1,170 @@
+"""
+홈택스 대량 발행 업로드용 엑셀(xlsx) 쓰기.
+
+openpyxl write_only 워크북으로 행을 하나씩 흘려 쓰므로, 셀 객체를 전부 메모리에 만들지 않고
+행 수와 관계없이 일정한 메모리로 저장합니다.
+
+홈택스 대량 발행은 파일 1개당 업로드할 수 있는 건수가 제한되어 있어,
+결과가 많으면 HOMETAX_MAX_ROWS 건씩 나눈 여러 파일로 만듭니다.
+기본값은 현재 프로세스에서 순서대로 쓰는 것입니다. 여러 스레드가 도는 Streamlit 서버에서 프로세스를
+fork 하는 것은 안전하지 않고, CPU 가 적은 서버에서는 빨라지지도 않기 때문입니다.
+프로세스 풀(max_workers > 1)은 입력 파일이 하나인 배치 실행(batch.run_batch)에서만 씁니다.
+"""
+import io
+import math
+import os
+import re
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, BinaryIO, List, Optional, Union
+
+import openpyxl
+import pandas as pd
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font
+
+HOMETAX_SHEET_NAME = 'sale1'
+
+# 홈택스 대량 발행 양식의 고정 안내 영역(1~5행). 6행이 컬럼명, 7행부터 데이터입니다.
+HOMETAX_TEMPLATE_HEADER = [
+    '엑셀 업로드 양식(전자세금계산서-일반)',
+    '★ 주황색으로 표시된 항목(작성일자, 공급자/공급받는자 등록번호·상호·성명, 공급가액 등)은 필수입력항목입니다.',
+    '★ 작성일자는 yyyymmdd, 일자는 dd 형식으로 입력합니다.',
+    '★ 영수(01)/청구(02) 구분을 반드시 입력하십시오.',
+    '★ 6행의 항목명과 열 순서는 수정하지 마십시오. 7행부터 작성한 내용만 업로드됩니다.',
+]
+HOMETAX_START_ROW = len(HOMETAX_TEMPLATE_HEADER)
+
+# 업로드 파일 1개당 최대 계산서 건수
+HOMETAX_MAX_ROWS = 100
+
+
+def write_hometax_excel(df: pd.DataFrame, target: Union[str, Path, BinaryIO]) -> None:
+    """
+    변환된 데이터프레임을 홈택스 업로드 양식 엑셀로 저장합니다.
+
+    Args:
+        df (pd.DataFrame): process_ecount_file 결과.
+        target: 저장할 파일 경로 또는 쓰기 가능한 파일 객체.
+    """
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet(HOMETAX_SHEET_NAME)
+
+    for line in HOMETAX_TEMPLATE_HEADER:
+        ws.append([line])
+
+    bold = Font(bold=True)
+    header_cells = []
+    for col in df.columns:
+        cell = WriteOnlyCell(ws, value=str(col))
+        cell.font = bold
+        header_cells.append(cell)
+    ws.append(header_cells)
+
+    for row in df.itertuples(index=False, name=None):
+        ws.append(_clean_row(row))
+
+    wb.save(target)
+
+
+def to_hometax_excel(df: pd.DataFrame) -> bytes:
+    """
+    변환된 데이터프레임을 홈택스 업로드용 엑셀(xlsx) 바이트로 저장합니다. (다운로드 버튼용)
+    """
+    output = io.BytesIO()
+    write_hometax_excel(df, output)
+    return output.getvalue()
+
+
+def split_for_upload(df: pd.DataFrame, chunk_size: int = HOMETAX_MAX_ROWS) -> List[pd.DataFrame]:
+    """
+    결과를 업로드 파일 단위(chunk_size 건)로 나눕니다. chunk_size 가 0 이하이면 나누지 않습니다.
+    """
+    if chunk_size <= 0 or len(df) <= chunk_size:
+        return [df]
+    return [df.iloc[start:start + chunk_size] for start in range(0, len(df), chunk_size)]
+
+
+def chunk_file_names(stem: str, count: int) -> List[str]:
+    """업로드 파일 이름 목록. 1개면 'stem.xlsx', 여러 개면 'stem_001.xlsx', 'stem_002.xlsx', ..."""
+    if count == 1:
+        return [f'{stem}.xlsx']
+    return [f'{stem}_{i:03d}.xlsx' for i in range(1, count + 1)]
+
+
+def remove_stale_chunks(output_dir: Union[str, Path], stem: str) -> List[Path]:
+    """
+    output_dir 에 남아 있는 지난 실행의 업로드 파일('stem.xlsx', 'stem_001.xlsx', ...)을 지웁니다.
+
+    다시 실행해 파일 수가 줄거나 번호 없는 이름과 번호 붙은 이름이 바뀌면 지난 파일이 새 파일 옆에 남아
+    중복 업로드(중복 발행)될 수 있기 때문입니다.
+
+    Returns:
+        List[Path]: 지운 파일 목록.
+    """
+    output_dir = Path(output_dir)
+    if not output_dir.is_dir():
+        return []
+    numbered = re.compile(re.escape(stem) + r'_\d{3,}\.xlsx')
+    removed = []
+    for path in output_dir.iterdir():
+        if path.name == f'{stem}.xlsx' or numbered.fullmatch(path.name):
+            path.unlink(missing_ok=True)
+            removed.append(path)
+    return removed
+
+
+def write_hometax_chunks(df: pd.DataFrame, output_dir: Union[str, Path], stem: str = 'tax_upload',
+                         chunk_size: int = HOMETAX_MAX_ROWS, max_workers: Optional[int] = 1) -> List[Path]:
+    """
+    결과를 나눠 output_dir 에 번호가 붙은 업로드 파일로 저장합니다. 같은 stem 의 지난 업로드 파일은 먼저 지웁니다.
+
+    Args:
+        max_workers (int, optional): 파일을 동시에 쓸 프로세스 수. 1(기본값)이면 현재 프로세스에서 순서대로 쓰고,
+            None 이면 CPU 코어 수만큼 씁니다. (배치 실행 전용, 호출마다 프로세스 풀을 새로 만듭니다)
+
+    Returns:
+        List[Path]: 저장된 파일 경로 목록.
+    """
+    chunks = split_for_upload(df, chunk_size)
+    paths = [Path(output_dir) / name for name in chunk_file_names(stem, len(chunks))]
+    remove_stale_chunks(output_dir, stem)
+
+    if len(chunks) == 1 or (max_workers or os.cpu_count() or 1) == 1:
+        for chunk, path in zip(chunks, paths):
+            write_hometax_excel(chunk, path)
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            list(pool.map(write_hometax_excel, chunks, paths))
+    return paths
+
+
+def to_hometax_zip(df: pd.DataFrame, stem: str = 'tax_upload', chunk_size: int = HOMETAX_MAX_ROWS,
+                   max_workers: Optional[int] = 1) -> bytes:
+    """
+    결과를 나눈 업로드 파일들을 하나의 zip 바이트로 묶습니다. (다운로드 버튼용)
+
+    Streamlit 서버에서 호출하므로 기본값(max_workers=1)으로 현재 프로세스에서 순서대로 씁니다.
+    """
+    chunks = split_for_upload(df, chunk_size)
+    names = chunk_file_names(stem, len(chunks))
+
+    if len(chunks) == 1 or (max_workers or os.cpu_count() or 1) == 1:
+        contents = [to_hometax_excel(chunk) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            contents = list(pool.map(to_hometax_excel, chunks))
+
+    output = io.BytesIO()
+    # xlsx 는 이미 압축된 형식이므로 다시 압축하지 않고 묶기만 합니다.
+    with zipfile.ZipFile(output, 'w', compression=zipfile.ZIP_STORED) as zf:
+        for name, content in zip(names, contents):
+            zf.writestr(name, content)
+    return output.getvalue()
+
+
+def _clean_row(row) -> List[Any]:
+    """빈 문자열, NaN, 정수 컬럼의 빈 값(pd.NA)은 빈 셀로 씁니다."""
+    return [None if value is pd.NA or value == '' or (isinstance(value, float) and math.isnan(value)) else value
+            for value in row]
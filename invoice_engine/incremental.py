@@ -0,0 +1,167 @@
+"""
+증분 변환: 지난 변환 이후 새로 생기거나 바뀐 계산서만 다시 내보냅니다.
+
+같은 달을 몇 줄 고쳐 다시 내보낸 파일을 처음부터 다시 변환/업로드하면 시간도 들고
+이미 발행한 계산서를 중복 발행할 위험이 있습니다. 변환할 때마다 계산서마다의 지문(fingerprint)을 저장해 두고,
+다음 변환에서 지문을 비교해 추가/변경된 계산서만 펼치고 엑셀로 씁니다.
+
+- 계산서 식별값(invoice_key): 20개 키 컬럼 값 + 같은 키 안의 계산서 순번의 해시
+- 지문(fingerprint): 그 계산서에 들어가는 품목 행(칸 번호와 값 컬럼)의 해시 합
+
+변경/삭제된 계산서는 이미 발행된 계산서의 수정발행이 필요할 수 있으므로 요약표로 따로 알려줍니다.
+"""
+from pathlib import Path
+from typing import NamedTuple, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from .canonical import canonical_values
+from .engine import (
+    DUP_COLUMN, KEY_COLUMNS, NUM_SLOTS, SLOT_COLUMN, STRATEGIES, VALUE_COLUMNS,
+    convert_work, invoice_ids_of, preprocess, round_won,
+)
+from .keys import first_positions
+from .metrics import NO_TIMER, StageTimer
+from .rules import ItemRules
+
+STATUS_ADDED = 'added'
+STATUS_CHANGED = 'changed'
+STATUS_REMOVED = 'removed'
+STATUS_UNCHANGED = 'unchanged'
+
+# 지문 파일에 함께 저장해 요약표(특히 삭제된 계산서)에 보여줄 컬럼
+SUMMARY_COLUMNS = ['Date', 'TaxNo_get', 'TaxTitle_get']
+FINGERPRINT_COLUMNS = ['invoice_key', 'fingerprint'] + SUMMARY_COLUMNS + ['items', 'price']
+
+
+class IncrementalResult(NamedTuple):
+    # 추가/변경된 계산서만 담은 홈택스 양식 데이터프레임
+    output: pd.DataFrame
+    # 이번 변환 전체의 계산서별 지문 (다음 변환에 previous 로 넘길 값)
+    fingerprints: pd.DataFrame
+    # 추가/변경/삭제된 계산서 목록 (status + SUMMARY_COLUMNS + items, price)
+    summary: pd.DataFrame
+
+
+def invoice_fingerprints(work: pd.DataFrame, value_columns: Optional[list] = None) -> Tuple[pd.DataFrame, np.ndarray]:
+    """
+    preprocess 결과에서 계산서마다 식별값과 지문을 계산합니다.
+
+    값은 표준 문자열로 바꿔 해시하므로, 다시 내보낸 파일에서 같은 값이 정수/실수로 다르게 읽혀도 지문이 같습니다.
+
+    Returns:
+        Tuple[pd.DataFrame, np.ndarray]: (계산서 id 순서의 FINGERPRINT_COLUMNS 표, 행별 계산서 id)
+    """
+    if value_columns is None:
+        value_columns = VALUE_COLUMNS
+    invoice_ids, n_invoices = invoice_ids_of(work)
+    first = first_positions(invoice_ids, n_invoices)
+
+    # 1. 식별값: 계산서 첫 행의 키 컬럼 + 계산서 순번
+    keys = canonical_values(work[KEY_COLUMNS].iloc[first])
+    keys[DUP_COLUMN] = work[DUP_COLUMN].to_numpy()[first]
+    invoice_key = pd.util.hash_pandas_object(keys, index=False).to_numpy()
+
+    # 2. 지문: 품목 행마다 (칸 번호, 값 컬럼)을 해시해 계산서별로 더함 (행 순서와 무관, uint64 범위에서 순환)
+    items = canonical_values(work[value_columns])
+    items[SLOT_COLUMN] = work[SLOT_COLUMN].to_numpy()
+    row_hash = pd.util.hash_pandas_object(items, index=False).to_numpy()
+    fingerprint = np.zeros(n_invoices, dtype=np.uint64)
+    np.add.at(fingerprint, invoice_ids, row_hash)
+
+    price = round_won(work['price'])
+    fingerprints = pd.DataFrame({
+        'invoice_key': invoice_key,
+        'fingerprint': fingerprint,
+        **{col: work[col].array.take(first) for col in SUMMARY_COLUMNS},
+        'items': np.bincount(invoice_ids, minlength=n_invoices),
+        'price': np.bincount(invoice_ids, weights=price, minlength=n_invoices).astype(np.int64),
+    }, columns=FINGERPRINT_COLUMNS)
+    return fingerprints, invoice_ids
+
+
+def diff_fingerprints(previous: Optional[pd.DataFrame], current: pd.DataFrame) -> Tuple[np.ndarray, pd.DataFrame]:
+    """
+    지난 지문과 이번 지문을 식별값으로 맞춰 비교합니다. (해시 조회 한 번, O(n))
+
+    Returns:
+        Tuple[np.ndarray, pd.DataFrame]: (이번 계산서별 상태 added/changed/unchanged, 삭제된 계산서의 지난 지문)
+    """
+    if previous is None or previous.empty:
+        return np.full(len(current), STATUS_ADDED, dtype=object), current.iloc[:0]
+
+    previous = previous.drop_duplicates('invoice_key')
+    position = pd.Index(previous['invoice_key']).get_indexer(current['invoice_key'])
+    found = position >= 0
+    same = np.zeros(len(current), dtype=bool)
+    same[found] = previous['fingerprint'].to_numpy()[position[found]] == current['fingerprint'].to_numpy()[found]
+
+    status = np.where(~found, STATUS_ADDED, np.where(same, STATUS_UNCHANGED, STATUS_CHANGED)).astype(object)
+    removed = previous[~previous['invoice_key'].isin(current['invoice_key'])]
+    return status, removed
+
+
+def convert_incremental(df: pd.DataFrame, previous: Optional[pd.DataFrame] = None, strategy: str = 'scatter',
+                        value_columns: Optional[list] = None, num_slots: int = NUM_SLOTS, pack_slots: bool = False,
+                        rules: Optional[ItemRules] = None, timer: StageTimer = NO_TIMER) -> IncrementalResult:
+    """
+    지난 변환의 지문과 비교해 추가/변경된 계산서만 변환합니다.
+
+    바뀌지 않은 계산서는 펼치기/합계/서식 단계를 건너뜁니다. previous 가 없으면 모든 계산서를 추가로 봅니다.
+
+    Args:
+        df (pd.DataFrame): 원본 이카운트 데이터프레임. (수정하지 않음)
+        previous (pd.DataFrame, optional): 지난 변환의 IncrementalResult.fingerprints (또는 load_fingerprints 결과).
+        나머지 인자는 process_ecount_file 과 같습니다.
+
+    Returns:
+        IncrementalResult: (변경분 홈택스 데이터, 이번 지문, 변경 요약)
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"알 수 없는 변환 방식입니다: {strategy} (사용 가능: {', '.join(STRATEGIES)})")
+    if value_columns is None:
+        value_columns = VALUE_COLUMNS
+
+    work = preprocess(df, num_slots, pack_slots, rules, timer, value_columns)
+
+    with timer.stage('fingerprint', rows_in=len(work)) as record:
+        fingerprints, invoice_ids = invoice_fingerprints(work, value_columns)
+        status, removed = diff_fingerprints(previous, fingerprints)
+        emit = status != STATUS_UNCHANGED
+        delta = work[emit[invoice_ids]]
+        record['rows_out'] = len(delta)
+
+    output = convert_work(delta, strategy, value_columns, num_slots, timer)
+
+    summary_columns = ['status'] + SUMMARY_COLUMNS + ['items', 'price']
+    summary = pd.concat([
+        fingerprints[emit].assign(status=status[emit])[summary_columns],
+        removed.assign(status=STATUS_REMOVED)[summary_columns],
+    ], ignore_index=True)
+    return IncrementalResult(output, fingerprints, summary)
+
+
+def save_fingerprints(fingerprints: pd.DataFrame, path: Union[str, Path]) -> None:
+    """지문 표를 CSV 로 저장합니다."""
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    fingerprints.to_csv(path, index=False, encoding='utf-8-sig')
+
+
+def load_fingerprints(source) -> Optional[pd.DataFrame]:
+    """
+    save_fingerprints 로 저장한 지문 표를 읽습니다. 경로에 파일이 없으면 None.
+
+    Args:
+        source: 파일 경로 또는 파일 객체 (st.file_uploader 결과 포함).
+    """
+    if isinstance(source, (str, Path)) and not Path(source).exists():
+        return None
+    return pd.read_csv(source, encoding='utf-8-sig', keep_default_na=False,
+                       dtype={'invoice_key': np.uint64, 'fingerprint': np.uint64, 'TaxNo_get': str, 'Date': str})
+
+
+def change_counts(summary: pd.DataFrame) -> dict:
+    """요약표의 상태별 계산서 수. (예: {'added': 3, 'changed': 1, 'removed': 0})"""
+    counts = summary['status'].value_counts()
+    return {status: int(counts.get(status, 0)) for status in (STATUS_ADDED, STATUS_CHANGED, STATUS_REMOVED)}
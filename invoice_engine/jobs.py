@@ -0,0 +1,194 @@
+"""
+변환 작업을 화면(Streamlit 스크립트) 밖의 스레드에서 실행하는 로컬 작업 실행기.
+
+큰 파일을 st.spinner 안에서 변환하면 끝날 때까지 그 화면이 멈추고, 새로 고침하면 진행 중이던 변환을 잃습니다.
+JobRunner 는 서버 프로세스에 하나만 두고 여러 사용자가 함께 씁니다.
+
+- 변환은 정해진 수의 작업 스레드에서 차례로 실행하고, 화면은 진행 상황만 읽어 그립니다.
+- 작업 id 는 파일 내용과 변환 옵션으로 정하므로(job_id_for), 새로 고침한 화면이나 같은 파일을
+  같은 옵션으로 변환하려는 다른 사용자는 새 작업을 만들지 않고 실행 중이거나 끝난 작업에 다시 연결됩니다.
+- 진행 상황은 작업마다 따로 두는 StageTimer 의 끝난 단계 수와 진행 중인 단계로 보여줍니다.
+  메모리 최대값은 프로세스 전체 값이므로 작업을 하나씩 실행할 때(max_workers=1)만 기록합니다.
+- 작업은 결과 데이터프레임을 들고 있지 않습니다. 작업 함수가 결과를 크기 제한이 있는 ResultCache 에 넣고,
+  화면은 작업의 key 로 캐시에서 꺼냅니다. 끝난 작업(상태와 단계 기록)은 max_finished 개까지 보관합니다.
+
+환경 변수:
+    INVOICE_JOB_WORKERS: 동시에 실행할 변환 수 (기본값: 2)
+"""
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Hashable, List, Optional
+
+from .metrics import StageTimer
+
+STATUS_QUEUED = 'queued'
+STATUS_RUNNING = 'running'
+STATUS_DONE = 'done'
+STATUS_FAILED = 'failed'
+
+DEFAULT_WORKERS = 2
+DEFAULT_MAX_FINISHED = 32
+
+# 진행률 계산에 쓰는 변환 단계 (StageTimer 단계 이름, 실행 순서)
+CONVERSION_STAGES = ['preprocess', 'filter', 'split', 'reshape', 'totals', 'format']
+
+
+def job_id_for(key: Hashable) -> str:
+    """결과 캐시 키(파일 내용 해시 + 변환 옵션)로 작업 id 를 만듭니다. (주소창에 넣을 수 있는 짧은 문자열)"""
+    return hashlib.sha256(repr(('job', key)).encode()).hexdigest()[:16]
+
+
+class Job:
+    """
+    변환 작업 하나의 상태.
+
+    status 는 queued → running → done/failed 순서로 바뀌며, 작업 스레드만 값을 씁니다.
+    결과는 보관하지 않으므로 key 로 결과 캐시에서 찾습니다.
+    """
+
+    def __init__(self, job_id: str, stages: List[str], key: Hashable = None, name: str = '',
+                 track_memory: bool = True):
+        self.id = job_id
+        self.stages = list(stages)
+        self.key = key
+        self.name = name
+        self.timer = StageTimer(track_memory=track_memory)
+        self.status = STATUS_QUEUED
+        self.error: Optional[Exception] = None
+        self.submitted_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (STATUS_DONE, STATUS_FAILED)
+
+    @property
+    def current_stage(self) -> Optional[str]:
+        """진행 중인 단계 이름. (단계 사이이거나 실행 전/후면 None)"""
+        return self.timer.current
+
+    def completed_stages(self) -> int:
+        """stages 중 끝난 단계 수."""
+        done = {record['stage'] for record in list(self.timer.records)}
+        return sum(stage in done for stage in self.stages)
+
+    def progress(self) -> float:
+        """0.0 ~ 1.0 진행률. (끝난 작업은 1.0, 캐시에서 가져와 건너뛴 단계는 끝날 때 한꺼번에 채워짐)"""
+        if self.finished or not self.stages:
+            return 1.0 if self.finished else 0.0
+        return min(self.completed_stages() / len(self.stages), 1.0)
+
+    @property
+    def elapsed(self) -> float:
+        """실행 시작 후 지난 시간(초). 아직 대기 중이면 0."""
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.time()) - self.started_at
+
+
+class JobRunner:
+    """
+    작업 id 로 변환 작업을 받아 스레드 풀에서 실행하고 상태를 보관합니다.
+
+    사용 예:
+        runner = JobRunner(max_workers=2)
+        job = runner.submit(job_id_for(key),
+                            lambda timer: cache.get_or_compute(key, lambda: process_ecount_file(df, timer=timer)),
+                            CONVERSION_STAGES, key=key)
+        ...
+        job = runner.get(job.id)   # 다른 요청(새로 고침)에서 같은 작업 찾기
+        if job.status == STATUS_DONE:
+            processed_df = cache.get(job.key)
+    """
+
+    def __init__(self, max_workers: int = DEFAULT_WORKERS, max_finished: int = DEFAULT_MAX_FINISHED):
+        self.max_workers = max_workers
+        self.max_finished = max_finished
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='invoice-job')
+        self._jobs: 'OrderedDict[str, Job]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> 'JobRunner':
+        """환경 변수(INVOICE_JOB_WORKERS) 설정으로 실행기를 만듭니다."""
+        return cls(max_workers=max(1, int(os.environ.get('INVOICE_JOB_WORKERS', DEFAULT_WORKERS))))
+
+    def submit(self, job_id: str, fn: Callable[[StageTimer], None], stages: List[str], key: Hashable = None,
+               name: str = '', retry: bool = False) -> Job:
+        """
+        작업을 실행 대기열에 넣습니다. 같은 id 의 작업이 이미 있으면 새로 만들지 않고 그 작업을 돌려줍니다.
+
+        Args:
+            job_id (str): 작업 id. (보통 job_id_for(결과 캐시 키))
+            fn (Callable[[StageTimer], None]): 작업 스레드에서 실행할 함수. 작업의 StageTimer 를 받아
+                단계를 기록하고, 결과는 key 로 결과 캐시에 넣습니다. (반환값은 쓰지 않음)
+                Streamlit 함수를 호출하면 안 됩니다.
+            stages (List[str]): 진행률 계산에 쓸 단계 이름.
+            key (Hashable, optional): 결과를 넣을 캐시 키 등, 작업과 함께 보관할 값.
+            name (str): 화면에 보여줄 이름 (업로드 파일명).
+            retry (bool): True 면 같은 id 의 끝난 작업(실패했거나, 결과가 캐시에서 밀려난 작업)을 새로 실행합니다.
+
+        Returns:
+            Job: 새로 만들었거나 이미 있던 작업.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None and not (retry and job.finished):
+                self._jobs.move_to_end(job_id)
+                return job
+            # 최대 메모리 기록(clear_refs)은 프로세스 전체 값이라 작업이 겹치면 서로의 값을 되돌립니다.
+            job = Job(job_id, stages, key, name, track_memory=self.max_workers == 1)
+            self._jobs[job_id] = job
+            self._jobs.move_to_end(job_id)
+            self._prune()
+        self._pool.submit(self._run, job, fn)
+        return job
+
+    def get(self, job_id: Optional[str]) -> Optional[Job]:
+        """작업 id 로 작업을 찾습니다. 없거나 이미 지운 작업이면 None."""
+        with self._lock:
+            return self._jobs.get(job_id) if job_id else None
+
+    def jobs(self) -> List[Job]:
+        """보관 중인 작업 목록. (최근에 제출하거나 다시 연결한 작업이 뒤)"""
+        with self._lock:
+            return list(self._jobs.values())
+
+    def queued_ahead(self, job: Job) -> int:
+        """job 보다 먼저 제출되어 아직 끝나지 않은(대기 또는 실행 중인) 작업 수."""
+        return sum(not other.finished and other.submitted_at < job.submitted_at for other in self.jobs())
+
+    def counts(self) -> Dict[str, int]:
+        """상태별 작업 수."""
+        counts = {STATUS_QUEUED: 0, STATUS_RUNNING: 0, STATUS_DONE: 0, STATUS_FAILED: 0}
+        for job in self.jobs():
+            counts[job.status] += 1
+        return counts
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._pool.shutdown(wait=wait)
+
+    @staticmethod
+    def _run(job: Job, fn: Callable[[StageTimer], None]) -> None:
+        job.started_at = time.time()
+        job.status = STATUS_RUNNING
+        try:
+            fn(job.timer)
+        except Exception as e:
+            job.error = e
+            job.status = STATUS_FAILED
+        else:
+            job.status = STATUS_DONE
+        finally:
+            job.finished_at = time.time()
+
+    def _prune(self) -> None:
+        """끝난 작업이 max_finished 개를 넘으면 오래된 것부터 지웁니다. (대기/실행 중인 작업은 지우지 않음)"""
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[:max(0, len(finished) - self.max_finished)]:
+            del self._jobs[job_id]
@@ -0,0 +1,64 @@
+"""
+여러 컬럼으로 된 계산서 키를 정수 id 로 바꾸는 도구.
+
+20개 문자열 컬럼을 groupby/merge 때마다 다시 해시하지 않도록, 컬럼마다 한 번씩만
+factorize 한 뒤 정수 코드를 자릿수처럼 합쳐 하나의 int64 id 로 만듭니다.
+"""
+from typing import List, Tuple
+
+import numpy as np
+import pandas as pd
+
+# 합친 코드가 int64 를 넘기 전에 다시 압축하는 기준
+_CODE_LIMIT = 2 ** 62
+
+
+def factorize_column(values) -> Tuple[np.ndarray, int]:
+    """
+    컬럼 하나를 정렬 순서가 유지되는 정수 코드로 바꿉니다. (NaN 도 하나의 값으로 취급)
+
+    Returns:
+        Tuple[np.ndarray, int]: (int64 코드, 고유값 수)
+    """
+    try:
+        codes, uniques = pd.factorize(values, sort=True, use_na_sentinel=False)
+    except TypeError:
+        # 숫자와 문자열이 섞여 정렬할 수 없으면 처음 나온 순서를 사용
+        codes, uniques = pd.factorize(values, sort=False, use_na_sentinel=False)
+    return codes.astype(np.int64, copy=False), len(uniques)
+
+
+def compress_codes(codes: np.ndarray) -> Tuple[np.ndarray, int]:
+    """정수 코드를 순서를 유지한 채 0..n-1 범위로 다시 매깁니다."""
+    codes, uniques = pd.factorize(codes, sort=True)
+    return codes.astype(np.int64, copy=False), len(uniques)
+
+
+def factorize_keys(df: pd.DataFrame, columns: List[str]) -> Tuple[np.ndarray, int]:
+    """
+    키 컬럼 묶음을 하나의 정수 id 로 바꿉니다.
+
+    id 의 크기 순서는 키 값을 컬럼 순서대로 정렬한 순서와 같으므로,
+    id 순으로 결과를 만들면 키로 정렬한 merge/pivot 결과와 행 순서가 같습니다.
+
+    Returns:
+        Tuple[np.ndarray, int]: (행별 int64 id, 고유 키 수)
+    """
+    codes = np.zeros(len(df), dtype=np.int64)
+    n = 1
+    for col in columns:
+        col_codes, size = factorize_column(df[col])
+        if n * size >= _CODE_LIMIT:
+            codes, n = compress_codes(codes)
+        codes = codes * size + col_codes
+        n *= max(size, 1)
+    return compress_codes(codes)
+
+
+def first_positions(codes: np.ndarray, n: int) -> np.ndarray:
+    """각 id 가 처음 나오는 행 위치. (정렬 없이 O(n))"""
+    first = np.empty(n, dtype=np.int64)
+    positions = np.arange(len(codes), dtype=np.int64)
+    # 뒤에서부터 채우면 같은 id 는 가장 앞선 위치가 마지막으로 남습니다.
+    first[codes[::-1]] = positions[::-1]
+    return first
@@ -0,0 +1,131 @@
+"""
+변환 단계별 소요 시간, 행 수, 메모리 측정.
+
+읽기 → 전처리 → 필터 → 칸 배정 → 펼치기 → 합계 → 서식 → 쓰기 단계마다
+걸린 시간, 들어오고 나간 행 수, 단계 중 최대 메모리를 기록해 느린 변환의 원인을 찾습니다.
+
+메모리는 프로세스 단위(RSS)로 잽니다. Linux 에서는 단계 시작 시 최대값 기록을 되돌려 단계별 최대값을,
+그 밖의 OS 에서는 프로세스 시작 이후 최대값을 기록합니다. (Streamlit 처럼 여러 요청을 함께 처리하는
+서버에서는 다른 요청의 메모리도 함께 잡힙니다.) /proc 도 resource 모듈도 없는 OS(Windows)에서는
+메모리를 기록하지 않습니다.
+"""
+import sys
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def rss_mb(field: str = 'VmHWM') -> Optional[float]:
+    """
+    현재 프로세스의 메모리 사용량(MB). field 가 'VmHWM' 이면 최대값, 'VmRSS' 면 현재값입니다.
+
+    /proc 이 없는 OS 에서는 프로세스 시작 이후 최대값(ru_maxrss)을, 그것도 잴 수 없으면(Windows) None 을 돌려줍니다.
+    """
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith(field + ':'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 는 KB, macOS 는 바이트 단위
+    return peak / 1024 / 1024 if sys.platform == 'darwin' else peak / 1024
+
+
+def reset_peak_rss() -> None:
+    """최대 메모리 기록을 현재 값으로 되돌립니다. (Linux 4.0 이상, 그 밖에서는 아무것도 하지 않음)"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        pass
+
+
+class StageTimer:
+    """
+    단계별 측정 기록.
+
+    사용 예:
+        timer = StageTimer()
+        with timer.stage('reshape', rows_in=len(df)) as record:
+            wide = reshape(df)
+            record['rows_out'] = len(wide)
+    """
+
+    def __init__(self, enabled: bool = True, track_memory: bool = True):
+        self.enabled = enabled
+        # 메모리를 잴 수 없는 OS 에서는 기록하지 않음 (rss_mb/peak_mb 는 None)
+        self.track_memory = track_memory and rss_mb('VmRSS') is not None
+        self.records: List[Dict] = []
+        # 진행 중인 단계 이름 (다른 스레드에서 진행 상황을 보여줄 때 사용)
+        self.current: Optional[str] = None
+
+    @contextmanager
+    def stage(self, name: str, rows_in: Optional[int] = None) -> Iterator[Dict]:
+        """단계 하나를 측정합니다. 단계가 끝나기 전에 record['rows_out'] 을 채워 주세요."""
+        record = {'stage': name, 'rows_in': rows_in, 'rows_out': None,
+                  'seconds': None, 'rss_mb': None, 'peak_mb': None}
+        if not self.enabled:
+            yield record
+            return
+
+        if self.track_memory:
+            record['rss_mb'] = round(rss_mb('VmRSS'), 1)
+            reset_peak_rss()
+        self.current = name
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record['seconds'] = round(time.perf_counter() - start, 4)
+            if self.track_memory:
+                record['peak_mb'] = round(rss_mb(), 1)
+            self.records.append(record)
+            self.current = None
+
+    @property
+    def total_seconds(self) -> float:
+        return round(sum(r['seconds'] for r in self.records), 4)
+
+    def to_frame(self) -> pd.DataFrame:
+        """단계별 기록을 표로. (UI 의 성능 패널용)"""
+        frame = pd.DataFrame(self.records, columns=['stage', 'rows_in', 'rows_out', 'seconds', 'rss_mb', 'peak_mb'])
+        return frame.astype({'rows_in': 'Int64', 'rows_out': 'Int64'})
+
+
+def merge_stage_records(records: List[Dict]) -> List[Dict]:
+    """
+    같은 이름의 단계 기록을 처음 나온 순서대로 하나로 합칩니다. (파티션마다 따로 잰 기록 요약용)
+
+    행 수와 시간은 더하고, 메모리는 가장 큰 값을 남깁니다.
+    """
+    merged: Dict[str, Dict] = {}
+    for record in records:
+        total = merged.get(record['stage'])
+        if total is None:
+            merged[record['stage']] = dict(record)
+            continue
+        for field in ('rows_in', 'rows_out', 'seconds'):
+            if record[field] is not None:
+                total[field] = (total[field] or 0) + record[field]
+        for field in ('rss_mb', 'peak_mb'):
+            if record[field] is not None:
+                total[field] = max(total[field] or 0, record[field])
+    for total in merged.values():
+        if total['seconds'] is not None:
+            total['seconds'] = round(total['seconds'], 4)
+    return list(merged.values())
+
+
+# 측정하지 않을 때 쓰는 빈 기록기
+NO_TIMER = StageTimer(enabled=False)
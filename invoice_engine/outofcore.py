@@ -0,0 +1,307 @@
+"""
+메모리보다 큰 이카운트 파일의 대용량(out-of-core) 변환.
+
+여러 해의 재발행 작업처럼 원본 전체와 변환 중간 결과를 한 번에 메모리에 올릴 수 없는 파일을 위해
+
+1. 원본을 조각(chunk)씩 한 번만 읽으면서 행을 계산서 키의 해시로 나눠 디스크의 임시 파일(spill)에 쌓고,
+2. 같은 키의 행이 모두 모인 파티션마다 process_ecount_file 로 따로 변환한 뒤 (여러 프로세스에서 병렬 가능),
+3. 결과를 파티션 순서대로 업로드 파일에 이어 씁니다.
+
+같은 계산서의 행은 항상 같은 파티션에 모이므로 결과 계산서는 한 번에 변환한 것과 같고,
+계산서 순서만 파티션 순서를 따릅니다. 최대 메모리는 파일 크기가 아니라 memory_budget_mb 로 정해집니다.
+"""
+import math
+import os
+import pickle
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from .engine import KEY_COLUMNS, STRATEGIES, VALUE_COLUMNS, derive_columns, process_ecount_file
+from .excel_io import iter_ecount_excel
+from .hometax_writer import HOMETAX_MAX_ROWS, chunk_file_names, remove_stale_chunks, write_hometax_excel
+from .metrics import NO_TIMER, StageTimer, merge_stage_records
+from .validation import ValidationError, has_errors, validate_ecount
+
+DEFAULT_MEMORY_BUDGET_MB = 1024
+
+# 메모리 예산을 행 수/파티션 수로 바꾸는 추정값 (synthetic 데이터로 측정)
+# - 엑셀을 읽는 동안 행당 메모리: 약 1.4~1.9KB
+# - 변환 중 최대 메모리 / 파티션 원본 크기: 약 2.2배 (결과 포함)
+# - 메모리의 원본 크기 / xlsx 파일 크기: 약 5배
+READ_BYTES_PER_ROW = 2048
+WORK_MEMORY_FACTOR = 3
+XLSX_EXPANSION = 6
+
+MIN_CHUNK_ROWS = 1000
+MIN_BUCKETS = 8
+# 읽는 동안 버킷마다 임시 파일을 열어 두므로 열린 파일 수 제한보다 작게
+MAX_BUCKETS = 256
+
+SPILL_PREFIX = 'invoice_spill_'
+
+# 파티션을 나눌 키 컬럼 (계산서 키의 일부)
+PARTITION_COLUMNS = ['Date', 'TaxNo_get']
+
+
+def plan_chunk_rows(memory_budget_mb: float) -> int:
+    """한 번에 읽을 행 수. 읽기에는 예산의 절반을 씁니다."""
+    return max(MIN_CHUNK_ROWS, int(memory_budget_mb * 1024 * 1024 / 2 / READ_BYTES_PER_ROW))
+
+
+def plan_buckets(source, memory_budget_mb: float, workers: int = 1) -> int:
+    """
+    임시 파일(버킷) 수. 파일 크기로 변환 메모리를 추정해, 버킷 하나가 작업 프로세스 예산의 절반 안에 들도록 정합니다.
+    (해시가 한쪽으로 쏠려도 예산을 넘지 않도록 2배로 나눔)
+    """
+    size = _source_size(source)
+    if size is None:
+        return MIN_BUCKETS
+    estimated = size * XLSX_EXPANSION * WORK_MEMORY_FACTOR
+    per_worker = memory_budget_mb * 1024 * 1024 / max(workers, 1)
+    return min(MAX_BUCKETS, max(MIN_BUCKETS, math.ceil(estimated * 2 / per_worker)))
+
+
+def bucket_of(df: pd.DataFrame, buckets: int) -> np.ndarray:
+    """
+    행마다 작성일자와 공급받는자 등록번호의 해시로 버킷 번호를 정합니다.
+
+    두 값은 계산서 키의 일부이므로 같은 계산서의 행은 항상 같은 버킷에 들어갑니다.
+    preprocess 와 같은 방법(derive_columns)으로 정리한 문자열을 해시하므로,
+    조각마다 dtype 이 달라도(정수/실수, 하이픈 유무) 같은 값이면 같은 버킷입니다.
+    """
+    derived = derive_columns(df)
+    keys = pd.DataFrame({col: derived[col] for col in PARTITION_COLUMNS}, index=df.index)
+    hashes = pd.util.hash_pandas_object(keys, index=False).to_numpy()
+    return (hashes % np.uint64(buckets)).astype(np.int64)
+
+
+def convert_out_of_core(source, output_dir: Union[str, Path], stem: str = 'tax_upload',
+                        chunk_size: int = HOMETAX_MAX_ROWS, memory_budget_mb: float = DEFAULT_MEMORY_BUDGET_MB,
+                        workers: int = 1, validate: bool = True, spill_dir: Optional[Union[str, Path]] = None,
+                        timer: StageTimer = NO_TIMER, **options) -> Tuple[int, int, List[Path]]:
+    """
+    이카운트 엑셀 파일을 메모리 예산 안에서 변환해 업로드 파일(들)로 저장합니다.
+
+    Args:
+        source: 이카운트 엑셀 파일 경로 또는 파일 객체.
+        output_dir: 업로드 파일을 저장할 디렉터리.
+        stem (str): 업로드 파일 이름 (write_hometax_chunks 와 같은 규칙으로 번호가 붙습니다).
+        chunk_size (int): 업로드 파일 1개당 계산서 건수. 0 이하이면 나누지 않습니다. (결과 전체를 메모리에 모음)
+        memory_budget_mb (float): 읽기와 파티션 변환에 쓸 최대 메모리 목표(MB). 여러 프로세스로 변환하면 나눠 씁니다.
+            계산서 하나(같은 키의 행)는 나눌 수 없으므로, 한 거래처에 행이 아주 많으면 넘을 수 있습니다.
+        workers (int): 파티션을 동시에 변환할 프로세스 수. 1이면 현재 프로세스에서 순서대로 변환합니다.
+        validate (bool): 읽으면서 조각마다 입력을 검증하고, 오류가 있으면 변환하지 않고 ValidationError 를 냅니다.
+        spill_dir (optional): 임시 파일을 만들 디렉터리. 기본값은 시스템 임시 디렉터리 (TMPDIR).
+        timer (StageTimer): 'spill' 단계, 파티션별 변환 단계(합산), 'write' 단계를 기록할 측정기.
+        **options: process_ecount_file 에 그대로 넘길 변환 옵션 (strategy, value_columns, num_slots, pack_slots, rules).
+
+    Returns:
+        Tuple[int, int, List[Path]]: (원본 행 수, 변환된 계산서 수, 저장된 파일 목록)
+    """
+    strategy = options.get('strategy', 'scatter')
+    if strategy not in STRATEGIES:
+        raise ValueError(f"알 수 없는 변환 방식입니다: {strategy} (사용 가능: {', '.join(STRATEGIES)})")
+    value_columns = options.get('value_columns') or VALUE_COLUMNS
+    buckets = plan_buckets(source, memory_budget_mb, workers)
+
+    with tempfile.TemporaryDirectory(prefix=SPILL_PREFIX, dir=spill_dir) as spill_root:
+        spill_paths = [Path(spill_root) / f'{i:04d}.pkl' for i in range(buckets)]
+
+        # 1. 한 번 읽으면서 버킷별 임시 파일에 나눠 쓰기
+        with timer.stage('spill') as record:
+            rows_in, template, reports = _spill(source, spill_paths, plan_chunk_rows(memory_budget_mb),
+                                                value_columns, validate)
+            record['rows_in'] = record['rows_out'] = rows_in
+
+        if validate:
+            report = pd.concat(reports, ignore_index=True).drop_duplicates(ignore_index=True)
+            if has_errors(report):
+                raise ValidationError(report)
+
+        # 2. 예산 안에 드는 만큼 연속한 버킷을 묶어 파티션으로 변환하고, 3. 순서대로 업로드 파일에 이어 쓰기
+        groups = _group_buckets(spill_paths, memory_budget_mb * 1024 * 1024 / max(workers, 1))
+        write_timer = StageTimer(enabled=timer.enabled, track_memory=timer.track_memory)
+        writer = _UploadWriter(Path(output_dir), stem, chunk_size, write_timer)
+        partition_records: List[Dict] = []
+
+        if not groups:
+            # 변환할 행이 없으면 한 번에 변환할 때와 같이 빈 결과(또는 같은 오류)를 냅니다.
+            writer.add(process_ecount_file(template, **options))
+        elif workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                for output, records in pool.map(_convert_partition, groups, repeat(timer.enabled), repeat(options)):
+                    writer.add(output)
+                    partition_records.extend(records)
+        else:
+            for group in groups:
+                output, records = _convert_partition(group, timer.enabled, options)
+                writer.add(output)
+                partition_records.extend(records)
+        paths = writer.close()
+
+    timer.records.extend(merge_stage_records(partition_records + write_timer.records))
+    return rows_in, writer.rows_written, paths
+
+
+def _spill(source, spill_paths: List[Path], chunk_rows: int, value_columns: List[str],
+           validate: bool) -> Tuple[int, pd.DataFrame, List[pd.DataFrame]]:
+    """
+    원본을 조각씩 읽어 버킷별 임시 파일에 pickle 로 이어 씁니다. (조각 순서대로 쌓이므로 버킷 안의 행 순서는 원본 순서)
+
+    Returns:
+        Tuple[int, pd.DataFrame, List[pd.DataFrame]]: (읽은 행 수, 0행짜리 원본 틀, 조각별 검증 결과)
+    """
+    rows_in = 0
+    template = pd.DataFrame()
+    reports = []
+    handles = [None] * len(spill_paths)
+    try:
+        for i, chunk in enumerate(iter_ecount_excel(source, chunk_rows)):
+            if i == 0:
+                template = chunk.iloc[:0]
+            rows_in += len(chunk)
+            if validate:
+                reports.append(validate_ecount(chunk))
+            if chunk.empty:
+                continue
+
+            columns = [col for col in dict.fromkeys(KEY_COLUMNS + value_columns + ['item', 'price'])
+                       if col in chunk.columns]
+            chunk = _plain_columns(chunk[columns])
+            codes = bucket_of(chunk, len(spill_paths))
+
+            order = np.argsort(codes, kind='stable')
+            bounds = np.searchsorted(codes[order], np.arange(len(spill_paths) + 1))
+            for bucket in np.flatnonzero(np.diff(bounds)):
+                if handles[bucket] is None:
+                    handles[bucket] = open(spill_paths[bucket], 'wb')
+                piece = chunk.take(order[bounds[bucket]:bounds[bucket + 1]])
+                pickle.dump(piece, handles[bucket], protocol=pickle.HIGHEST_PROTOCOL)
+    finally:
+        for handle in handles:
+            if handle is not None:
+                handle.close()
+    return rows_in, template, reports
+
+
+def _plain_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    범주형 컬럼을 값 dtype 으로 바꿉니다. 조각마다 범주가 달라 합치면 어차피 풀리므로,
+    임시 파일 크기가 메모리 크기와 비슷해져 파티션 크기를 파일 크기로 어림할 수 있습니다.
+    """
+    plain = {col: df[col].astype(df[col].cat.categories.dtype)
+             for col in df.columns if isinstance(df[col].dtype, pd.CategoricalDtype)}
+    return df.assign(**plain) if plain else df
+
+
+def _group_buckets(spill_paths: List[Path], budget_bytes: float) -> List[List[Path]]:
+    """
+    비어 있지 않은 버킷을 순서대로, 변환 메모리 추정치가 예산을 넘기 전까지 묶어 파티션 목록을 만듭니다.
+    """
+    groups: List[List[Path]] = []
+    current: List[Path] = []
+    current_bytes = 0
+    for path in spill_paths:
+        if not path.exists():
+            continue
+        size = path.stat().st_size
+        if current and (current_bytes + size) * WORK_MEMORY_FACTOR > budget_bytes:
+            groups.append(current)
+            current, current_bytes = [], 0
+        current.append(path)
+        current_bytes += size
+    if current:
+        groups.append(current)
+    return groups
+
+
+def load_spill(paths: List[Path]) -> pd.DataFrame:
+    """버킷 임시 파일들에 이어 쓴 조각을 모두 읽어 하나의 데이터프레임으로 합칩니다."""
+    pieces = []
+    for path in paths:
+        with open(path, 'rb') as f:
+            while True:
+                try:
+                    pieces.append(pickle.load(f))
+                except EOFError:
+                    break
+    return pd.concat(pieces) if len(pieces) > 1 else pieces[0]
+
+
+def _convert_partition(paths: List[Path], track: bool, options: Dict) -> Tuple[pd.DataFrame, List[Dict]]:
+    """파티션 하나를 읽어 변환합니다. (작업 프로세스에서 실행)"""
+    timer = StageTimer(enabled=track)
+    output = process_ecount_file(load_spill(paths), timer=timer, **options)
+    return output, timer.records
+
+
+class _UploadWriter:
+    """
+    파티션 결과를 받아 chunk_size 건이 찰 때마다 업로드 파일로 씁니다.
+
+    파일 이름은 write_hometax_chunks 와 같습니다. (1개면 'stem.xlsx', 여러 개면 'stem_001.xlsx', ...)
+    같은 stem 의 지난 업로드 파일은 처음에 지웁니다.
+    """
+
+    def __init__(self, output_dir: Path, stem: str, chunk_size: int, timer: StageTimer):
+        remove_stale_chunks(output_dir, stem)
+        self.output_dir = output_dir
+        self.stem = stem
+        self.chunk_size = chunk_size
+        self.timer = timer
+        self.pending: List[pd.DataFrame] = []
+        self.pending_rows = 0
+        self.rows_written = 0
+        self.paths: List[Path] = []
+
+    def add(self, df: pd.DataFrame) -> None:
+        self.pending.append(df)
+        self.pending_rows += len(df)
+        if self.chunk_size <= 0 or self.pending_rows < self.chunk_size:
+            return
+
+        block = pd.concat(self.pending, ignore_index=True) if len(self.pending) > 1 else df
+        full = len(block) - len(block) % self.chunk_size
+        for start in range(0, full, self.chunk_size):
+            self._write(block.iloc[start:start + self.chunk_size])
+        self.pending = [block.iloc[full:]]
+        self.pending_rows = len(block) - full
+
+    def close(self) -> List[Path]:
+        """남은 결과를 쓰고, 파일이 1개뿐이면 번호 없는 이름으로 바꿉니다."""
+        if self.pending_rows or not self.paths:
+            self._write(pd.concat(self.pending, ignore_index=True) if len(self.pending) > 1 else self.pending[0])
+        self.pending, self.pending_rows = [], 0
+
+        if len(self.paths) == 1:
+            single = self.output_dir / chunk_file_names(self.stem, 1)[0]
+            os.replace(self.paths[0], single)
+            self.paths = [single]
+        return self.paths
+
+    def _write(self, df: pd.DataFrame) -> None:
+        path = self.output_dir / f'{self.stem}_{len(self.paths) + 1:03d}.xlsx'
+        with self.timer.stage('write', rows_in=len(df)) as record:
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            write_hometax_excel(df, path)
+            record['rows_out'] = len(df)
+        self.paths.append(path)
+        self.rows_written += len(df)
+
+
+def _source_size(source) -> Optional[int]:
+    """입력 파일 크기(바이트). 알 수 없으면 None."""
+    if isinstance(source, (str, Path)):
+        return os.path.getsize(source)
+    if hasattr(source, 'seek') and hasattr(source, 'tell'):
+        position = source.tell()
+        size = source.seek(0, os.SEEK_END)
+        source.seek(position)
+        return size
+    return None
@@ -0,0 +1,100 @@
+"""
+변환 한 번을 cProfile 로 기록하는 선택 기능.
+
+배치 실행(--profile)과 Streamlit 페이지의 숨은 옵션(?profile=1)에서 사용합니다.
+결과는 pstats 파일(.prof)로 저장해 snakeviz, `python -m pstats` 등으로 열어 볼 수 있고,
+가장 오래 걸린 함수 목록을 표로 만들어 바로 확인할 수 있습니다.
+"""
+import cProfile
+import io
+import marshal
+import pstats
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Tuple, Union
+
+import pandas as pd
+
+DEFAULT_TOP_N = 30
+PROFILE_SUFFIX = '_profile'
+
+
+class ProfileRun:
+    """
+    cProfile 기록 한 번.
+
+    사용 예:
+        run = ProfileRun()
+        with run.profile():
+            process_ecount_file(df)
+        print(run.top_functions(20))
+    """
+
+    def __init__(self):
+        self.profiler = cProfile.Profile()
+
+    @contextmanager
+    def profile(self) -> Iterator['ProfileRun']:
+        self.profiler.enable()
+        try:
+            yield self
+        finally:
+            self.profiler.disable()
+
+    def stats(self) -> pstats.Stats:
+        return pstats.Stats(self.profiler)
+
+    def top_functions(self, n: int = DEFAULT_TOP_N, sort: str = 'cumtime') -> pd.DataFrame:
+        """
+        가장 오래 걸린 함수 n 개를 표로 만듭니다.
+
+        Args:
+            n (int): 보여줄 함수 수.
+            sort (str): 정렬 기준. 'cumtime'(하위 호출 포함) 또는 'tottime'(함수 자체).
+
+        Returns:
+            pd.DataFrame: function, location, ncalls, tottime, cumtime 컬럼의 표.
+        """
+        rows = []
+        for (filename, line, name), (_, ncalls, tottime, cumtime, _) in self.stats().stats.items():
+            rows.append({
+                'function': name,
+                'location': f'{_short_path(filename)}:{line}',
+                'ncalls': ncalls,
+                'tottime': round(tottime, 4),
+                'cumtime': round(cumtime, 4),
+            })
+        frame = pd.DataFrame(rows, columns=['function', 'location', 'ncalls', 'tottime', 'cumtime'])
+        return frame.sort_values(sort, ascending=False, kind='stable').head(n).reset_index(drop=True)
+
+    def to_bytes(self) -> bytes:
+        """pstats 파일(.prof) 내용. (다운로드 버튼용)"""
+        self.profiler.create_stats()
+        return marshal.dumps(self.profiler.stats)
+
+    def save(self, directory: Union[str, Path], stem: str, top_n: int = DEFAULT_TOP_N) -> Tuple[Path, Path]:
+        """
+        '<stem>_profile.prof' 와 상위 함수 표 '<stem>_profile.txt' 를 저장합니다.
+
+        Returns:
+            Tuple[Path, Path]: (.prof 경로, .txt 경로)
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        prof_path = directory / f'{stem}{PROFILE_SUFFIX}.prof'
+        text_path = directory / f'{stem}{PROFILE_SUFFIX}.txt'
+        prof_path.write_bytes(self.to_bytes())
+
+        out = io.StringIO()
+        pstats.Stats(self.profiler, stream=out).sort_stats('cumulative').print_stats(top_n)
+        text_path.write_text(out.getvalue(), encoding='utf-8')
+        return prof_path, text_path
+
+
+def _short_path(filename: str) -> str:
+    """site-packages 이후 또는 패키지 이후 경로만 남깁니다."""
+    for marker in ('site-packages/', 'invoice_engine/'):
+        index = filename.rfind(marker)
+        if index >= 0:
+            return filename[index + len(marker):] if marker == 'site-packages/' else filename[index:]
+    return filename
@@ -0,0 +1,166 @@
+"""
+품목 칸 배정 규칙표.
+
+거래처(공급받는자 등록번호)와 품목명 패턴을 품목 칸 번호에 대응시키는 규칙을 CSV 파일에서 읽습니다.
+규칙은 위에서부터 먼저 맞는 것이 적용되며, 특정 거래처 처리(예: 하나은행)를 추가할 때
+코드 수정 없이 규칙 파일에 한 줄만 추가하면 됩니다.
+
+규칙 파일 컬럼:
+    customer: 공급받는자 등록번호(TaxNo_get). 비우거나 '*' 이면 모든 거래처. '?', '*' 패턴 사용 가능.
+    item: 품목명. 비우거나 '*' 이면 모든 품목. '?', '*' 패턴 사용 가능.
+    slot: 품목 칸 번호 (pack_slots 사용 시에는 칸을 채우는 순서). 0 이면 변환에서 제외.
+    single: 1 이면 품목마다 별도 계산서로 발행.
+    memo: 설명 (선택)
+"""
+import csv
+import hashlib
+import io
+from fnmatch import fnmatchcase
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_RULES_PATH = Path(__file__).with_name('item_rules.csv')
+
+_ANY = '*'
+_PATTERN_CHARS = set('*?[')
+
+
+class ItemRules:
+    """
+    컴파일된 품목 칸 배정 규칙.
+
+    패턴이 없는 규칙은 (거래처, 품목) / 거래처 / 품목 별 사전으로 색인하고,
+    '*', '?' 패턴이 들어간 규칙만 따로 순서대로 검사합니다.
+    """
+
+    def __init__(self, rules: List[Tuple[str, str, int, bool]]):
+        """
+        Args:
+            rules: (customer, item, slot, single) 목록. 앞에 있는 규칙이 우선합니다.
+        """
+        self.rules = [(_normalize(c), _normalize(i), int(slot), bool(single)) for c, i, slot, single in rules]
+        # 규칙 내용이 같으면 같은 값 (변환 결과 캐시 키에 사용)
+        self.fingerprint = hashlib.sha256(repr(self.rules).encode()).hexdigest()
+
+        self._exact: Dict[Tuple[str, str], int] = {}
+        self._by_customer: Dict[str, int] = {}
+        self._by_item: Dict[str, int] = {}
+        self._any: Optional[int] = None
+        self._patterns: List[int] = []
+
+        for index, (customer, item, _, _) in enumerate(self.rules):
+            if _is_pattern(customer) or _is_pattern(item):
+                self._patterns.append(index)
+            elif customer != _ANY and item != _ANY:
+                self._exact.setdefault((customer, item), index)
+            elif customer != _ANY:
+                self._by_customer.setdefault(customer, index)
+            elif item != _ANY:
+                self._by_item.setdefault(item, index)
+            elif self._any is None:
+                self._any = index
+
+    @classmethod
+    def from_csv(cls, source: Union[str, Path, io.IOBase, bytes]) -> 'ItemRules':
+        """
+        규칙 CSV 파일(UTF-8, 엑셀에서 저장한 BOM 포함 가능)을 읽습니다.
+        """
+        if isinstance(source, bytes):
+            text = source.decode('utf-8-sig')
+        elif isinstance(source, (str, Path)):
+            text = Path(source).read_text(encoding='utf-8-sig')
+        else:
+            text = source.read()
+            if isinstance(text, bytes):
+                text = text.decode('utf-8-sig')
+
+        rules = []
+        for line_no, row in enumerate(csv.DictReader(io.StringIO(text)), start=2):
+            try:
+                slot = int(row.get('slot') or 0)
+                single = str(row.get('single') or '0').strip() in ('1', 'Y', 'y', 'TRUE', 'true')
+            except ValueError:
+                raise ValueError(f"규칙 파일 {line_no}행의 slot 값이 숫자가 아닙니다: {row.get('slot')}")
+            rules.append((row.get('customer') or '', row.get('item') or '', slot, single))
+        return cls(rules)
+
+    @property
+    def max_slot(self) -> int:
+        """규칙표에서 가장 큰 품목 칸 번호. (고정 칸 방식에 필요한 계산서 1장당 최소 칸 수)"""
+        return max((slot for _, _, slot, _ in self.rules), default=0)
+
+    def match(self, customer: str, item: str) -> Optional[int]:
+        """(거래처, 품목)에 처음으로 맞는 규칙 번호. 맞는 규칙이 없으면 None."""
+        candidates = [
+            self._exact.get((customer, item)),
+            self._by_customer.get(customer),
+            self._by_item.get(item),
+            self._any,
+        ]
+        best = min((c for c in candidates if c is not None), default=None)
+
+        for index in self._patterns:
+            if best is not None and index > best:
+                break
+            rule_customer, rule_item, _, _ = self.rules[index]
+            if _matches(rule_customer, customer) and _matches(rule_item, item):
+                best = index
+                break
+        return best
+
+    def apply(self, customers: pd.Series, items: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        행마다 품목 칸 번호와 별도 발행 여부를 계산합니다.
+
+        규칙은 행마다가 아니라 고유한 (거래처, 품목) 조합마다 한 번만 검사하고,
+        결과를 정수 코드로 행 전체에 펼칩니다.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (품목 칸 번호, 0 은 제외 / 별도 발행 여부)
+        """
+        customer_codes, customer_values = pd.factorize(_text_values(customers))
+        item_codes, item_values = pd.factorize(_text_values(items))
+
+        pair_codes, pairs = pd.factorize(customer_codes.astype(np.int64) * len(item_values) + item_codes)
+        # 고유값을 파이썬 리스트로 한 번에 꺼내 둡니다. (문자열 배열을 원소마다 인덱싱하면 느림)
+        customer_values, item_values = customer_values.tolist(), item_values.tolist()
+
+        pair_slots = np.zeros(len(pairs), dtype=np.int64)
+        pair_single = np.zeros(len(pairs), dtype=bool)
+        for k, pair in enumerate(pairs):
+            customer_code, item_code = divmod(int(pair), len(item_values))
+            index = self.match(customer_values[customer_code], item_values[item_code])
+            if index is not None:
+                _, _, pair_slots[k], pair_single[k] = self.rules[index]
+
+        return pair_slots[pair_codes], pair_single[pair_codes]
+
+
+@lru_cache(maxsize=None)
+def default_rules() -> ItemRules:
+    """패키지에 포함된 기본 규칙표 (item_rules.csv). 처음 한 번만 읽습니다."""
+    return ItemRules.from_csv(DEFAULT_RULES_PATH)
+
+
+def _text_values(values: pd.Series) -> pd.Series:
+    """빈 값을 '' 로 채운 문자열 컬럼. 범주형은 '' 범주를 추가한 뒤 채웁니다. (빈 품목 행은 규칙에 맞지 않아 제외됨)"""
+    if isinstance(values.dtype, pd.CategoricalDtype) and values.hasnans and '' not in values.cat.categories:
+        values = values.cat.add_categories('')
+    return values.fillna('').astype(str)
+
+
+def _normalize(value) -> str:
+    value = '' if value is None else str(value).strip()
+    return value or _ANY
+
+
+def _is_pattern(value: str) -> bool:
+    return value != _ANY and bool(_PATTERN_CHARS & set(value))
+
+
+def _matches(pattern: str, value: str) -> bool:
+    return pattern == _ANY or fnmatchcase(value, pattern)
@@ -0,0 +1,149 @@
+"""
+벤치마크와 결과 비교용 가상 이카운트 '판매현황(거래처품목별-TAX1양식)' 데이터.
+
+실제 내보내기와 비슷하게 거래처마다 작성일자가 다른 계산서가 몇 장씩 있고,
+계산서 한 장에 임대료/관리비/전기료/주차료 품목이 섞여 있으며, 하나은행 거래처와
+공급가액 0 이하(반품/정정) 행, 규칙표에 없는 품목, 품목명이 빈 행도 일부 섞습니다.
+"""
+import datetime
+from typing import Dict, Optional
+
+import numpy as np
+import openpyxl
+import pandas as pd
+
+from .bizno import BIZNO_WEIGHTS
+from .engine import KEY_COLUMNS, VALUE_COLUMNS
+from .excel_io import CATEGORY_MAX_RATIO
+
+# 이카운트 TAX1 양식의 컬럼 순서
+ECOUNT_COLUMNS = KEY_COLUMNS + VALUE_COLUMNS + ['Title_get']
+
+# 품목 비율 (기타는 기본 규칙표에 없어 변환에서 제외되는 품목)
+ITEM_MIX: Dict[str, float] = {'임대료': 0.3, '관리비': 0.3, '전기료': 0.25, '주차료': 0.1, '기타': 0.05}
+
+# 계산서 1장당 평균 품목 행 수, 거래처 1곳당 평균 계산서 수
+ROWS_PER_INVOICE = 3.0
+INVOICES_PER_CUSTOMER = 2.0
+
+# 하나은행 (기본 규칙표에서 품목마다 계산서를 따로 발행하는 거래처)
+HANA_BIZNO = 2298500670
+SUPPLIER_BIZNO = 2648117782
+
+# 공급가액이 0 이하인 행의 비율
+NON_POSITIVE_RATIO = 0.02
+
+# 품목명이 빈 행의 비율 (범주형 품목 컬럼에 빈 값이 섞인 경우, 변환에서 제외됨)
+BLANK_ITEM_RATIO = 0.01
+
+
+def make_bizno(serials: np.ndarray) -> np.ndarray:
+    """
+    일련번호로 검증번호가 맞는 10자리 사업자등록번호(정수)를 만듭니다.
+    """
+    # 앞 9자리: 세무서 코드(101~999) + 구분(2자리) + 일련번호(4자리)
+    prefix = 101_00_0000 + np.asarray(serials, dtype=np.int64) % 899_000_000
+    digits = (prefix[:, None] // 10 ** np.arange(8, -1, -1)) % 10
+    total = digits @ BIZNO_WEIGHTS + (digits[:, 8] * 5) // 10
+    return prefix * 10 + (10 - total % 10) % 10
+
+
+def synthetic_ecount(n_rows: int, seed: int = 0, rows_per_invoice: float = ROWS_PER_INVOICE,
+                     invoices_per_customer: float = INVOICES_PER_CUSTOMER,
+                     year_month: str = '202507') -> pd.DataFrame:
+    """
+    read_ecount_excel 결과와 같은 모양(컬럼, 범주형 문자열)의 가상 이카운트 데이터를 만듭니다.
+
+    Args:
+        n_rows (int): 품목 행 수.
+        seed (int): 난수 시드. 같은 값이면 같은 데이터가 만들어집니다.
+        rows_per_invoice (float): 계산서 1장당 평균 품목 행 수.
+        invoices_per_customer (float): 거래처 1곳당 평균 계산서(작성일자) 수.
+        year_month (str): 작성일자의 연월 (yyyymm).
+
+    Returns:
+        pd.DataFrame: 작성일자, 거래처 순으로 정렬된 데이터.
+    """
+    rng = np.random.default_rng(seed)
+    n_invoices = max(1, round(n_rows / rows_per_invoice))
+    n_customers = max(1, round(n_invoices / invoices_per_customer))
+
+    # 1. 거래처 (0번은 하나은행)
+    customer_ids = np.arange(n_customers)
+    taxno = make_bizno(customer_ids * 7919 + seed)
+    taxno[0] = HANA_BIZNO
+    titles = np.array([f'(주)거래처{i:06d}' for i in customer_ids], dtype=object)
+    titles[0] = '㈜하나은행'
+
+    # 2. 계산서: 거래처와 작성일자(yyyymmdd-순번)
+    invoice_customer = rng.integers(0, n_customers, n_invoices)
+    invoice_day = rng.integers(1, 29, n_invoices)
+    invoice_date = np.char.add(
+        np.char.add(year_month, np.char.zfill(invoice_day.astype(str), 2)),
+        np.char.add('-', rng.integers(1, 10, n_invoices).astype(str)))
+
+    # 3. 품목 행: 계산서를 골라 작성일자/거래처 순으로 정렬
+    row_invoice = rng.integers(0, n_invoices, n_rows)
+    row_invoice = row_invoice[np.lexsort((invoice_customer[row_invoice], invoice_date[row_invoice]))]
+    row_customer = invoice_customer[row_invoice]
+
+    price = rng.integers(10, 5000, n_rows) * 1000
+    price[rng.random(n_rows) < NON_POSITIVE_RATIO] *= -1
+    items = rng.choice(np.array(list(ITEM_MIX), dtype=object), n_rows, p=list(ITEM_MIX.values()))
+    items[rng.random(n_rows) < BLANK_ITEM_RATIO] = np.nan
+
+    columns = {
+        'code': np.full(n_rows, 11),
+        'Date': invoice_date[row_invoice],
+        'TaxNo_Send': np.full(n_rows, SUPPLIER_BIZNO),
+        'J1': np.full(n_rows, np.nan),
+        'Title_send': '(주)공급자',
+        'Name_send': '홍길동',
+        'Addr_send': '부산시 사산대로 27길 7-15',
+        'sub1': '부동산',
+        'sub2': '부동산임대',
+        'Email_send': 'tax@supplier.example',
+        'TaxNo_get': taxno[row_customer],
+        'J2': np.full(n_rows, np.nan),
+        'TaxTitle_get': titles[row_customer],
+        'Name_get': np.array([f'대표{i:06d}' for i in customer_ids], dtype=object)[row_customer],
+        'Addr_get': np.array([f'부산시 사산대로 {i % 500 + 1}길 {i:06d}호' for i in customer_ids],
+                             dtype=object)[row_customer],
+        'type1': np.array(['도소매업', '부동산', '서비스'], dtype=object)[row_customer % 3],
+        'type2': np.array(['임대관리', '전자제품', '함석 외', '의약품'], dtype=object)[row_customer % 4],
+        'Email_get': np.array([f'c{i:06d}@example.com' for i in customer_ids], dtype=object)[row_customer],
+        'Email2_get': np.full(n_rows, np.nan),
+        'note_Sum': '경남은행 281-890022-19305 (주)공급자',
+        'day': invoice_day[row_invoice],
+        'item': items,
+        'standard': np.full(n_rows, np.nan),
+        'quantity': np.full(n_rows, np.nan),
+        'unit_price': np.full(n_rows, np.nan),
+        'price': price,
+        'VAT': price // 10,
+        'note': np.array([f'{f}0{r}호' for f in range(1, 10) for r in range(1, 4)], dtype=object)[row_customer % 27],
+        'Title_get': titles[row_customer],
+    }
+    df = pd.DataFrame({name: columns[name] for name in ECOUNT_COLUMNS}, index=pd.RangeIndex(n_rows))
+
+    # read_ecount_excel 처럼 반복이 많은 문자열 컬럼은 (정렬된) 범주형으로
+    for name in df.columns:
+        values = df[name]
+        if pd.api.types.is_string_dtype(values.dtype) and values.nunique() <= len(values) * CATEGORY_MAX_RATIO:
+            df[name] = values.astype('category')
+    return df
+
+
+def write_ecount_excel(df: pd.DataFrame, target, title: Optional[str] = None) -> None:
+    """
+    데이터프레임을 이카운트 내보내기와 같은 배치(1행 회사명, 2행 컬럼명, 마지막 2행 총합계/출력일시)로 저장합니다.
+    """
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet()
+    ws.append([title or '회사명 : (주)공급자 / 가상 데이터'])
+    ws.append(list(df.columns))
+    for row in df.itertuples(index=False, name=None):
+        ws.append([None if isinstance(v, float) and v != v else v for v in row])
+    ws.append(['총합계'])
+    ws.append([datetime.datetime.now().strftime('%Y/%m/%d %H:%M:%S')])
+    wb.save(target)
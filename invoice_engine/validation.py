@@ -0,0 +1,112 @@
+"""
+변환 전 이카운트 데이터 사전 검증.
+
+변환(품목 펼치기)을 시작하기 전에 몇 번의 배열 연산만으로 입력 전체를 검사해,
+홈택스에서 반려될 파일을 변환이 끝난 뒤가 아니라 업로드 직후에 걸러냅니다.
+"""
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+from .bizno import bizno_is_valid, normalize_bizno
+from .dates import normalize_dates
+from .engine import KEY_COLUMNS, VAT_RATE, VAT_TOLERANCE
+
+# 변환에 반드시 필요한 컬럼 ('code' 는 변환 중에 채우고, 품목 칸의 다른 값 컬럼은 없으면 빈 칸으로 채움)
+REQUIRED_COLUMNS = [c for c in KEY_COLUMNS if c != 'code'] + ['item', 'price', 'VAT']
+
+
+# 검증 결과 심각도: 오류가 있으면 변환하지 않고, 경고는 알려주기만 합니다.
+SEVERITY_ERROR = 'error'
+SEVERITY_WARNING = 'warning'
+
+REPORT_COLUMNS = ['row', 'column', 'severity', 'message', 'value']
+
+
+def validate_ecount(df: pd.DataFrame, vat_tolerance: float = VAT_TOLERANCE) -> pd.DataFrame:
+    """
+    이카운트 원본 데이터를 변환 전에 검증합니다.
+
+    공급가액은 모든 행에서 숫자인지 검사하고, 나머지 항목은 공급가액이 0보다 커서 실제로 발행될 행만 검사합니다.
+    필수 컬럼이 없으면 행 단위 검사는 하지 않고 누락된 컬럼만 보고합니다.
+
+    Args:
+        df (pd.DataFrame): read_ecount_excel 로 읽은 원본 데이터프레임. (수정하지 않음)
+        vat_tolerance (float): 세액과 공급가액 × 10% 의 허용 차이(원). 품목별 원 단위 절사/반올림 차이는 허용합니다.
+
+    Returns:
+        pd.DataFrame: 문제 하나당 한 행인 검증 결과표.
+            row 는 데이터 행 순번(1부터, 컬럼명 행 제외)이고, 컬럼 누락은 row 가 비어 있습니다.
+    """
+    # 1. 필수 컬럼
+    missing = [c for c in REQUIRED_COLUMNS if c not in df.columns]
+    if missing:
+        return pd.DataFrame({
+            'row': pd.array([pd.NA] * len(missing), dtype='Int64'),
+            'column': missing,
+            'severity': SEVERITY_ERROR,
+            'message': '필수 컬럼이 없습니다.',
+            'value': '',
+        }, columns=REPORT_COLUMNS)
+
+    price = pd.to_numeric(df['price'], errors='coerce')
+    target = (price > 0).to_numpy()
+    all_rows = np.ones(len(df), dtype=bool)
+    problems: List[pd.DataFrame] = []
+
+    def report(column: str, bad: np.ndarray, severity: str, message: str, within: np.ndarray = target) -> None:
+        # bad 는 within 으로 고른 행에 대한 값
+        if bad.any():
+            problems.append(pd.DataFrame({
+                'row': df.index.to_numpy()[within][bad] + 1,
+                'column': column,
+                'severity': severity,
+                'message': message,
+                'value': df[column].to_numpy()[within][bad].astype(str),
+            }))
+
+    # 2. 공급가액 (비어 있거나 숫자가 아니면 발행 대상인지 정할 수 없음)
+    report('price', price.isna().to_numpy(), SEVERITY_ERROR, '공급가액이 비어 있거나 숫자가 아닙니다.', within=all_rows)
+
+    # 3. 사업자등록번호 형식과 검증번호 (하이픈/실수 형태는 정규화하고, 종사업장 표시 '_B' 는 제외하고 검사)
+    for column in ['TaxNo_Send', 'TaxNo_get']:
+        valid = bizno_is_valid(normalize_bizno(df[column][target]))
+        report(column, ~valid, SEVERITY_ERROR, '사업자등록번호가 10자리가 아니거나 검증번호가 맞지 않습니다.')
+
+    # 4. 작성일자 (yyyymmdd 문자열/정수, 엑셀 날짜, 일련번호 중 하나이고 실제 날짜여야 함)
+    dates, _ = normalize_dates(df['Date'][target])
+    bad_date = (dates == '').to_numpy(dtype=bool)
+    report('Date', bad_date, SEVERITY_ERROR, '작성일자를 날짜(yyyymmdd)로 읽을 수 없습니다.')
+
+    # 5. 세액 (숫자여야 하고, 공급가액 × 10% 와 다르면 경고)
+    vat = pd.to_numeric(df['VAT'][target], errors='coerce').to_numpy(dtype=float)
+    blank_vat = np.isnan(vat)
+    report('VAT', blank_vat, SEVERITY_ERROR, '세액이 비어 있거나 숫자가 아닙니다.')
+    expected = price[target].to_numpy(dtype=float) * VAT_RATE
+    bad_vat = ~blank_vat & ~(np.abs(vat - expected) <= vat_tolerance)
+    report('VAT', bad_vat, SEVERITY_WARNING, '세액이 공급가액의 10%와 다릅니다.')
+
+    if not problems:
+        return pd.DataFrame({c: pd.Series(dtype='Int64' if c == 'row' else object) for c in REPORT_COLUMNS})
+    result = pd.concat(problems, ignore_index=True)
+    result['row'] = result['row'].astype('Int64')
+    return result.sort_values(['row', 'column'], kind='stable', ignore_index=True)
+
+
+def has_errors(report: pd.DataFrame) -> bool:
+    """검증 결과표에 변환을 막아야 하는 오류가 있는지 확인합니다."""
+    return bool((report['severity'] == SEVERITY_ERROR).any())
+
+
+class ValidationError(ValueError):
+    """사전 검증에서 오류가 발견되어 변환하지 않은 경우. report 에 검증 결과표가 들어 있습니다."""
+
+    def __init__(self, report: pd.DataFrame):
+        errors = int((report['severity'] == SEVERITY_ERROR).sum())
+        super().__init__(f'입력 검증 오류 {errors}건')
+        self.report = report
+
+    def __reduce__(self):
+        # 배치 작업 프로세스에서 메인 프로세스로 넘어올 때 검증 결과표를 유지
+        return type(self), (self.report,)
@@ -0,0 +1,438 @@
+"""
+이카운트 → 홈택스 변환 페이지 공통 Streamlit 화면.
+
+변환 로직은 invoice_engine 에 있고, 각 페이지는 사용할 변환 방식만 골라 render_converter_page 를 호출합니다.
+변환은 서버 프로세스가 함께 쓰는 JobRunner 의 작업 스레드에서 실행하고, 화면은 진행 상황만 주기적으로 그립니다.
+작업 id 를 주소(?job=...)에 남겨 두므로 새로 고침해도 같은 작업에 다시 연결됩니다.
+"""
+import io
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from invoice_engine import (
+    CONVERSION_STAGES,
+    HOMETAX_MAX_ROWS,
+    MAX_SLOTS,
+    NUM_SLOTS,
+    IncrementalResult,
+    ItemRules,
+    Job,
+    JobRunner,
+    ProfileRun,
+    ResultCache,
+    DiskCache,
+    StageTimer,
+    change_counts,
+    content_key,
+    convert_incremental,
+    default_rules,
+    process_ecount_file,
+    has_errors,
+    job_id_for,
+    load_fingerprints,
+    read_ecount_excel,
+    to_hometax_excel,
+    to_hometax_zip,
+    validate_ecount,
+    vat_mismatches,
+)
+
+# 미리보기에서 한 번에 브라우저로 보내는 행 수 선택지
+PREVIEW_PAGE_SIZES = [50, 100, 500, 1000]
+PREVIEW_MODES = ['페이지', '무작위 표본']
+
+# 변환 작업 진행 상황을 다시 그리는 간격(초)
+JOB_POLL_SECONDS = 1.0
+
+# 진행 상황에 보여줄 단계 이름
+STAGE_LABELS = {
+    'read': '파일 읽기',
+    'validate': '입력 검증',
+    'preprocess': '전처리',
+    'filter': '필터',
+    'split': '품목 칸 배정',
+    'reshape': '품목 펼치기',
+    'totals': '합계 계산',
+    'format': '서식 정리',
+    'fingerprint': '지난 변환과 비교',
+    'write': '업로드 파일 만들기',
+}
+
+
+def render_converter_page(strategy: str = 'scatter', value_columns: Optional[List[str]] = None) -> None:
+    """
+    파일 업로드 → 미리보기 → 변환 옵션 → 변환 → 다운로드 화면을 그립니다.
+
+    Args:
+        strategy (str): invoice_engine 의 품목 펼치기 방식 ('scatter', 'merge', 'pivot', 'group').
+        value_columns (List[str], optional): 품목 칸마다 펼칠 컬럼.
+    """
+    st.set_page_config(page_title="홈택스 세금계산서 변환기", layout="wide")
+    st.title("📄 이카운트 엑셀 → 홈택스 업로드 양식 변환기")
+    st.info("이카운트 '판매현황(거래처품목별-TAX1양식)' 엑셀 파일을 홈택스 대량 발행 양식으로 변환합니다.")
+
+    uploaded_file = st.file_uploader("📂 이카운트 엑셀 파일을 업로드하세요", type=["xlsx", "xls"])
+    cache = _result_cache()
+    runner = _job_runner()
+
+    if not uploaded_file:
+        # 새로 고침하면 업로드 파일은 사라지지만, 주소에 남은 작업 id 로 진행 중이거나 끝난 변환에 다시 연결합니다.
+        job = runner.get(st.query_params.get('job'))
+        if job is None:
+            st.info("파일을 업로드하면 변환을 시작할 수 있습니다.")
+            return
+        st.info(f"이전에 시작한 변환 작업에 다시 연결했습니다: **{job.name}**")
+        try:
+            _render_job(job, cache)
+        except Exception as e:
+            _render_error(e)
+        return
+
+    st.success(f"파일이 성공적으로 업로드되었습니다: **{uploaded_file.name}**")
+
+    read_timer = StageTimer()
+
+    try:
+        # 업로드 파일 내용으로 캐시 키를 만들어, 화면을 다시 그릴 때마다 파일을 다시 읽지 않습니다.
+        data = uploaded_file.getvalue()
+        file_key = content_key(data)
+
+        # 엑셀 파일 로드 (양식에 맞게 첫 행은 건너뛰고, 마지막 2개 행은 제외)
+        df_original = cache.get_or_compute(('parsed', file_key), lambda: _read_excel(data, read_timer))
+        _remember_stages(file_key, read_timer)
+
+        # 사용자가 원본 데이터를 확인할 수 있도록 expander 안에 미리보기 제공
+        with st.expander("📂 업로드한 원본 파일 미리보기"):
+            _render_preview(df_original, cache, ('parsed', file_key), 'original')
+
+        # 변환 전에 입력을 검증해, 홈택스에서 반려될 파일은 변환하지 않습니다.
+        report = cache.get_or_compute(('validated', file_key), lambda: validate_ecount(df_original))
+        if has_errors(report):
+            st.error(f"입력 파일에서 오류 {int((report['severity'] == 'error').sum())}건이 발견되어 변환할 수 없습니다. "
+                     "이카운트에서 아래 행을 수정한 뒤 다시 업로드해주세요.")
+            st.dataframe(report)
+            return
+        if not report.empty:
+            with st.expander(f"⚠️ 확인이 필요한 항목 {len(report)}건"):
+                st.dataframe(report)
+
+        with st.expander("⚙️ 변환 옵션"):
+            pack_slots = st.checkbox(
+                "품목을 1번 칸부터 빈 칸 없이 채우기 (칸이 부족하면 계산서를 추가로 발행)", value=False)
+            num_slots = st.number_input(
+                "계산서 1장당 품목 칸 수", min_value=1 if pack_slots else NUM_SLOTS, max_value=MAX_SLOTS,
+                value=NUM_SLOTS, step=1)
+            rules_file = st.file_uploader(
+                "품목 칸 배정 규칙표 (CSV, 비우면 기본 규칙 사용)", type=["csv"], key="rules_file")
+            incremental = st.checkbox("지난 변환 이후 추가/변경된 계산서만 내보내기 (증분 변환)", value=False)
+            previous_file = st.file_uploader(
+                "지난 변환의 계산서 지문 파일 (fingerprints.csv, 비우면 모든 계산서를 새로 내보냄)", type=["csv"],
+                key="fingerprints_file") if incremental else None
+            # 주소 뒤에 ?profile=1 을 붙였을 때만 보이는 옵션
+            profile = st.query_params.get('profile') == '1' and st.checkbox(
+                "🔬 변환 과정 프로파일링 (cProfile)", value=False)
+
+        rules = ItemRules.from_csv(rules_file.getvalue()) if rules_file else default_rules()
+        options = dict(strategy=strategy, value_columns=value_columns, num_slots=int(num_slots),
+                       pack_slots=pack_slots, rules=rules)
+        result_key = (file_key, strategy, tuple(value_columns or ()), int(num_slots), pack_slots, rules.fingerprint)
+        previous_data = None
+        stages = CONVERSION_STAGES + ['write']
+        if incremental:
+            previous_data = previous_file.getvalue() if previous_file else b''
+            result_key += ('incremental', content_key(previous_data) if previous_data else '')
+            stages = CONVERSION_STAGES + ['fingerprint', 'write']
+        job_id = job_id_for(result_key)
+
+        # 버튼은 누른 직후 한 번만 True 이므로, 변환한 결과 키를 기억해 두고 다시 그릴 때도 결과를 보여줍니다.
+        # 새로 고침 뒤 같은 파일을 다시 올린 경우에도 주소의 작업 id 가 같으면 그 작업을 보여줍니다.
+        clicked = st.button("🚀 변환 실행", use_container_width=True)
+        if clicked:
+            st.session_state['converted_key'] = result_key
+        if st.session_state.get('converted_key') != result_key and st.query_params.get('job') != job_id:
+            return
+
+        # 같은 파일/옵션의 작업이 이미 있으면 (다른 사용자가 시작한 것이라도) 새로 실행하지 않고 그 작업을 씁니다.
+        # 버튼을 누르면 끝난 작업은 다시 실행합니다. (캐시에 남은 단계는 다시 계산하지 않음)
+        job = runner.submit(
+            job_id, lambda timer: _convert(df_original, options, cache, result_key, timer, previous_data),
+            stages, key=result_key, name=uploaded_file.name, retry=clicked)
+        st.query_params['job'] = job.id
+        _render_job(job, cache)
+        if profile and job.finished:
+            _render_profile(data, options, result_key)
+
+    except Exception as e:
+        _render_error(e)
+
+
+def _read_excel(data: bytes, timer: StageTimer):
+    with timer.stage('read') as record:
+        df = read_ecount_excel(io.BytesIO(data))
+        record['rows_out'] = len(df)
+    return df
+
+
+@st.cache_resource
+def _result_cache() -> ResultCache:
+    """서버 프로세스 전체에서 함께 쓰는 변환 결과 캐시. (INVOICE_CACHE_DIR 디스크 캐시로 다른 서버와 공유)"""
+    return ResultCache(disk=DiskCache.from_env())
+
+
+@st.cache_resource
+def _job_runner() -> JobRunner:
+    """서버 프로세스 전체에서 함께 쓰는 변환 작업 실행기. (INVOICE_JOB_WORKERS 개 변환을 동시에 실행)"""
+    return JobRunner.from_env()
+
+
+def _convert(df_original: pd.DataFrame, options: dict, cache: ResultCache, result_key: tuple, timer: StageTimer,
+             previous_data: Optional[bytes] = None):
+    """
+    작업 스레드에서 변환하고, 업로드 파일까지 만들어 캐시에 넣습니다. (Streamlit 함수를 호출하지 않음)
+
+    변환 결과(데이터프레임, 증분 변환이면 IncrementalResult)는 ('converted',) + result_key 로 캐시에서 찾습니다.
+
+    Args:
+        previous_data (bytes, optional): 증분 변환일 때 지난 변환의 지문 파일 내용 (없으면 b'').
+            None 이면 일반 변환입니다.
+    """
+    # 변환 엔진은 원본을 수정하지 않으므로 캐시된 원본을 그대로 전달
+    if previous_data is not None:
+        previous = load_fingerprints(io.BytesIO(previous_data)) if previous_data else None
+        result = cache.get_or_compute(
+            ('converted',) + result_key,
+            lambda: convert_incremental(df_original, previous, timer=timer, **options))
+        processed_df = result.output
+    else:
+        result = processed_df = cache.get_or_compute(
+            ('converted',) + result_key,
+            lambda: process_ecount_file(df_original, timer=timer, **options))
+
+    # 화면은 결과 캐시에서 결과를 꺼내므로, 캐시에 넣을 수 없는 결과는 작업을 실패로 끝냅니다.
+    # (성공으로 끝내면 화면에서 결과를 찾지 못해 다시 실행해도 같은 상황이 반복됨)
+    if not cache.can_hold(result):
+        raise MemoryError(f'변환 결과({len(processed_df):,}건)가 서버 결과 캐시 한도 '
+                          f'({cache.max_bytes // (1024 * 1024)}MB)보다 커서 화면에서 보여줄 수 없습니다. '
+                          f'일괄 변환(python -m invoice_engine)으로 변환해주세요.')
+    if not processed_df.empty:
+        _upload_file(processed_df, cache, result_key, timer)
+
+
+def _render_job(job: Job, cache: ResultCache) -> None:
+    """작업이 끝나지 않았으면 진행 상황을, 끝났으면 결과를 그립니다. 실패한 작업은 그 예외를 다시 일으킵니다."""
+    if not job.finished:
+        _render_progress(job)
+        return
+    if job.error is not None:
+        raise job.error
+
+    # 작업은 결과를 들고 있지 않으므로 크기 제한이 있는 결과 캐시에서 꺼냅니다.
+    result = cache.get(('converted',) + job.key)
+    if result is None:
+        st.warning("변환 결과가 서버 캐시에 남아 있지 않습니다. 파일을 업로드한 상태에서 '🚀 변환 실행' 을 다시 눌러주세요.")
+        return
+    if isinstance(result, IncrementalResult):
+        _render_changes(result)
+        processed_df = result.output
+    else:
+        processed_df = result
+    _render_result(processed_df, cache, job.key, job.timer)
+    _render_performance(_remember_stages(job.key[0], StageTimer()) + _remember_stages(job.key, job.timer))
+
+
+@st.fragment(run_every=JOB_POLL_SECONDS)
+def _render_progress(job: Job) -> None:
+    """진행 상황만 주기적으로 다시 그립니다. 작업이 끝나면 화면 전체를 다시 그려 결과를 보여줍니다."""
+    if job.finished:
+        st.rerun()
+
+    if job.started_at is None:
+        ahead = _job_runner().queued_ahead(job)
+        st.progress(0.0, text=f"⏳ 다른 변환이 끝나기를 기다리는 중입니다... (앞에 {ahead}건)")
+    else:
+        stage = job.current_stage
+        label = STAGE_LABELS.get(stage, stage) if stage else '다음 단계 준비'
+        st.progress(job.progress(), text=f"⏳ {label} 중... "
+                                         f"({job.completed_stages()}/{len(job.stages)} 단계, {job.elapsed:.0f}초)")
+    st.caption("변환은 서버에서 계속 진행됩니다. 페이지를 새로 고치거나 닫았다가 같은 주소로 다시 열어도 이 작업에 다시 연결됩니다.")
+
+
+def _render_error(e: Exception) -> None:
+    st.error(f"파일을 처리하는 중 오류가 발생했습니다: {e}")
+    st.warning("업로드한 파일이 '판매현황(거래처품목별-TAX1양식)'이 맞는지 확인해주세요.")
+
+
+def _render_changes(result) -> None:
+    """증분 변환의 추가/변경/삭제 요약과 다음 변환에 쓸 지문 파일 다운로드 버튼을 그립니다."""
+    counts = change_counts(result.summary)
+    st.subheader("🔁 지난 변환과 비교")
+    st.info(f"추가 {counts['added']}건, 변경 {counts['changed']}건, 삭제 {counts['removed']}건. "
+            "추가/변경된 계산서만 업로드 파일에 담았습니다.")
+    if counts['changed'] or counts['removed']:
+        st.warning("변경/삭제된 계산서는 이미 발행한 계산서의 수정발행이 필요할 수 있습니다. 아래 목록을 확인해주세요.")
+    if not result.summary.empty:
+        st.dataframe(result.summary, hide_index=True)
+    st.download_button(
+        label="📥 이번 변환의 계산서 지문 파일 다운로드 (다음 증분 변환에 사용)",
+        data=result.fingerprints.to_csv(index=False).encode('utf-8-sig'),
+        file_name="fingerprints.csv",
+        mime="text/csv",
+        use_container_width=True
+    )
+
+
+def _render_result(processed_df, cache: ResultCache, result_key: tuple, timer: StageTimer) -> None:
+    """변환 결과 미리보기와 다운로드 버튼을 그립니다."""
+    st.subheader("✅ 변환 결과 미리보기")
+    if processed_df.empty:
+        st.warning("변환된 데이터가 없습니다. 원본 데이터를 확인해주세요.")
+        return
+
+    _render_preview(processed_df, cache, ('converted',) + result_key, 'result')
+
+    mismatched = int(vat_mismatches(processed_df).sum())
+    if mismatched:
+        st.warning(f"세액 합계가 공급가액 합계의 10%와 다른 계산서가 {mismatched}건 있습니다. "
+                   "홈택스에서 반려될 수 있으니 확인해주세요.")
+
+    if len(processed_df) <= HOMETAX_MAX_ROWS:
+        st.download_button(
+            label="📥 'tax_upload.xlsx' 파일 다운로드",
+            data=_upload_file(processed_df, cache, result_key, timer),
+            file_name="tax_upload.xlsx",
+            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            use_container_width=True
+        )
+    else:
+        # 홈택스 업로드 건수 제한에 맞춰 나눈 파일들을 zip 으로 묶어 제공
+        file_count = -(-len(processed_df) // HOMETAX_MAX_ROWS)
+        st.info(f"변환 결과 {len(processed_df)}건을 {HOMETAX_MAX_ROWS}건씩 {file_count}개 파일로 나눴습니다.")
+        st.download_button(
+            label=f"📥 'tax_upload.zip' ({file_count}개 파일) 다운로드",
+            data=_upload_file(processed_df, cache, result_key, timer),
+            file_name="tax_upload.zip",
+            mime="application/zip",
+            use_container_width=True
+        )
+
+
+def _render_preview(df: pd.DataFrame, cache: ResultCache, key: tuple, name: str) -> None:
+    """
+    캐시된 데이터프레임을 통째로 브라우저에 보내지 않고, 컬럼 요약과 선택한 페이지(또는 무작위 표본)의 행만 그립니다.
+
+    Args:
+        key (tuple): df 의 캐시 키. 컬럼 요약도 이 키로 한 번만 계산해 캐시합니다.
+        name (str): 같은 화면의 여러 미리보기를 구분하는 위젯 키 접두어.
+    """
+    rows_tab, summary_tab = st.tabs([f"행 보기 ({len(df):,}행 × {len(df.columns)}열)", "컬럼 요약"])
+
+    with summary_tab:
+        st.dataframe(cache.get_or_compute(('summary',) + key, lambda: _summarize(df)), hide_index=True)
+
+    with rows_tab:
+        columns = st.multiselect("표시할 컬럼 (비우면 모든 컬럼)", list(df.columns), key=f'{name}_columns')
+        mode_col, size_col, page_col = st.columns(3)
+        mode = mode_col.radio("보기 방식", PREVIEW_MODES, horizontal=True, key=f'{name}_mode')
+        page_size = size_col.selectbox("한 번에 볼 행 수", PREVIEW_PAGE_SIZES, key=f'{name}_page_size')
+
+        if mode == PREVIEW_MODES[0]:
+            page_count = max(1, -(-len(df) // page_size))
+            # 행 수/페이지 크기가 바뀌면 새 위젯으로 만들어 범위를 벗어난 페이지 번호가 남지 않게 합니다.
+            page = page_col.number_input(f"페이지 (전체 {page_count:,})", min_value=1, max_value=page_count,
+                                         value=1, step=1, key=f'{name}_page_{page_size}_{page_count}')
+            start = (int(page) - 1) * page_size
+            view = df.iloc[start:start + page_size]
+        else:
+            seed_key = f'{name}_seed'
+            if page_col.button("🔀 다른 표본 보기", key=f'{name}_resample'):
+                st.session_state[seed_key] = st.session_state.get(seed_key, 0) + 1
+            view = df.sample(min(page_size, len(df)), random_state=st.session_state.get(seed_key, 0)).sort_index()
+
+        st.dataframe(view[columns] if columns else view)
+
+
+def _summarize(df: pd.DataFrame) -> pd.DataFrame:
+    """컬럼마다 타입, 값이 있는 행 수, 고유값 수, (숫자 컬럼의) 최소/최대, 예시 값을 정리한 표."""
+    rows = []
+    for col in df.columns:
+        values = df[col]
+        filled = values.notna().to_numpy()
+        if not pd.api.types.is_numeric_dtype(values.dtype):
+            filled = filled & (values.astype(object) != '').to_numpy()
+        numeric = pd.api.types.is_numeric_dtype(values.dtype) and not pd.api.types.is_bool_dtype(values.dtype)
+        first = np.flatnonzero(filled)[:1]
+        rows.append({
+            '컬럼': str(col),
+            '타입': str(values.dtype),
+            '값이 있는 행': int(filled.sum()),
+            '고유값 수': int(values[filled].nunique()),
+            '최소': str(values.min()) if numeric and filled.any() else '',
+            '최대': str(values.max()) if numeric and filled.any() else '',
+            '예시': str(values.iloc[first[0]]) if len(first) else '',
+        })
+    return pd.DataFrame(rows)
+
+
+def _upload_file(processed_df: pd.DataFrame, cache: ResultCache, result_key: tuple, timer: StageTimer) -> bytes:
+    """홈택스 업로드 파일 내용. 건수 제한을 넘으면 나눈 파일들을 묶은 zip 입니다. (캐시에 없을 때만 만듦)"""
+    if len(processed_df) <= HOMETAX_MAX_ROWS:
+        return cache.get_or_compute(('xlsx',) + result_key, lambda: _write(timer, to_hometax_excel, processed_df))
+    return cache.get_or_compute(('zip',) + result_key, lambda: _write(timer, to_hometax_zip, processed_df))
+
+
+def _write(timer: StageTimer, writer, processed_df) -> bytes:
+    with timer.stage('write', rows_in=len(processed_df)) as record:
+        data = writer(processed_df)
+        record['rows_out'] = len(processed_df)
+    return data
+
+
+def _remember_stages(key, timer: StageTimer) -> list:
+    """
+    이번 실행에서 잰 단계 기록을 세션에 보관하고, 같은 key 로 지금까지 잰 기록을 돌려줍니다.
+
+    캐시에서 가져온 단계는 다시 실행되지 않으므로, 처음 계산할 때 잰 값을 계속 보여주기 위해서입니다.
+    """
+    measured = st.session_state.setdefault('stage_metrics', {}).setdefault(key, {})
+    measured.update({record['stage']: record for record in timer.records})
+    return list(measured.values())
+
+
+def _render_performance(records: list) -> None:
+    """단계별 소요 시간/행 수/메모리 패널을 그립니다."""
+    if not records:
+        return
+
+    recorded = StageTimer()
+    recorded.records = records
+    with st.expander("⏱️ 성능 (단계별 소요 시간)"):
+        st.dataframe(recorded.to_frame(), hide_index=True)
+        st.caption(f"합계 {recorded.total_seconds:.3f}초. 캐시에서 가져온 단계는 처음 계산할 때 잰 값입니다. "
+                   "메모리(MB)는 서버 프로세스 전체 기준이며, 변환을 동시에 여러 개 실행하는 서버에서는 "
+                   "변환 단계의 메모리를 기록하지 않습니다.")
+
+
+def _render_profile(data: bytes, options: dict, result_key: tuple) -> None:
+    """
+    캐시를 거치지 않고 읽기부터 엑셀 쓰기까지를 cProfile 로 기록해 상위 함수 표와 .prof 파일을 제공합니다.
+    """
+    profiles = st.session_state.setdefault('profiles', {})
+    if result_key not in profiles:
+        run = ProfileRun()
+        with st.spinner('프로파일링 중입니다...'), run.profile():
+            processed_df = process_ecount_file(read_ecount_excel(io.BytesIO(data)), **options)
+            to_hometax_excel(processed_df)
+        profiles[result_key] = (run.top_functions(), run.to_bytes())
+
+    top_functions, prof = profiles[result_key]
+    with st.expander("🔬 프로파일 결과 (하위 호출 포함 시간 순)", expanded=True):
+        st.dataframe(top_functions, hide_index=True)
+        st.download_button(
+            label="📥 'convert.prof' 다운로드 (snakeviz, python -m pstats 로 열기)",
+            data=prof,
+            file_name="convert.prof",
+            mime="application/octet-stream",
+        )